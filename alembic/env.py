@@ -10,6 +10,7 @@ from app.models.prices import Price
 from app.models.token import Token
 from app.models.subscriptions import Subscription
 from app.models.users import User
+from app.models.ingestion_fence import IngestionFence
 
 config = context.config
 
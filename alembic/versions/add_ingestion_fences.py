@@ -0,0 +1,35 @@
+"""add ingestion fences
+
+Revision ID: add_ingestion_fences
+Revises: add_tokens_with_user_id
+Create Date: 2026-10-18
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "add_ingestion_fences"
+down_revision: Union[str, Sequence[str], None] = "add_tokens_with_user_id"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "ingestion_fences",
+        sa.Column("lock_key", sa.String(100), primary_key=True),
+        sa.Column("token", sa.BigInteger, nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("ingestion_fences")
@@ -0,0 +1,92 @@
+"""add covering (token_id, timestamp desc) index on prices
+
+Revision ID: add_prices_token_timestamp_index
+Revises: partition_prices
+Create Date: 2026-10-18
+"""
+
+from typing import Optional, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "add_prices_token_timestamp_index"
+down_revision: Union[str, Sequence[str], None] = "partition_prices"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX_NAME = "ix_prices_token_id_timestamp"
+INDEX_DEFINITION = (
+    '(token_id, "timestamp" DESC) INCLUDE (price_dex, price_cex, spread)'
+)
+
+
+def _list_partitions(conn) -> list[str]:
+    # Kept local so the revision doesn't depend on app code that may change.
+    return list(conn.execute(sa.text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE parent.relname = 'prices' "
+        "ORDER BY child.relname"
+    )).scalars())
+
+
+def _has_attached_index(conn, partition: str) -> bool:
+    # Partitions created after the parent index get their own copy.
+    return conn.execute(sa.text(
+        "SELECT EXISTS ("
+        "  SELECT 1 FROM pg_index i"
+        "  JOIN pg_inherits h ON h.inhrelid = i.indexrelid"
+        "  WHERE i.indrelid = CAST(:partition AS regclass)"
+        "  AND h.inhparent = CAST(:parent AS regclass)"
+        ")"
+    ), {"partition": f'"{partition}"', "parent": INDEX_NAME}).scalar()
+
+
+def _index_is_valid(conn, index_name: str) -> Optional[bool]:
+    return conn.execute(sa.text(
+        "SELECT i.indisvalid FROM pg_index i "
+        "JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE c.relname = :name"
+    ), {"name": index_name}).scalar()
+
+
+def upgrade() -> None:
+    # The parent index starts out invalid; each partition is indexed
+    # concurrently and attached, so ingestion keeps writing meanwhile.
+    # Partitions created later inherit the index automatically. Every
+    # step is idempotent so an interrupted upgrade can simply be re-run.
+    op.execute(
+        f"CREATE INDEX IF NOT EXISTS {INDEX_NAME} "
+        f"ON ONLY prices {INDEX_DEFINITION}"
+    )
+    conn = op.get_bind()
+    partitions = _list_partitions(conn)
+
+    with op.get_context().autocommit_block():
+        for partition in partitions:
+            if _has_attached_index(conn, partition):
+                continue
+            index_name = f"{partition}_token_id_timestamp_idx"
+            if _index_is_valid(conn, index_name) is False:
+                # A failed CONCURRENTLY build leaves an INVALID index
+                # behind; attaching it would keep the parent invalid.
+                op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{index_name}"')
+            op.execute(
+                f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{index_name}" '
+                f'ON "{partition}" {INDEX_DEFINITION}'
+            )
+            op.execute(
+                f'ALTER INDEX {INDEX_NAME} ATTACH PARTITION "{index_name}"'
+            )
+
+    # Every token_id lookup, including the ON DELETE CASCADE from tokens,
+    # is served by the composite index's leading column.
+    op.drop_index("ix_prices_token_id", table_name="prices", if_exists=True)
+
+
+def downgrade() -> None:
+    op.create_index("ix_prices_token_id", "prices", ["token_id"])
+    op.drop_index(INDEX_NAME, table_name="prices")
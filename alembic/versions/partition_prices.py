@@ -0,0 +1,156 @@
+"""partition prices by timestamp
+
+Revision ID: partition_prices
+Revises: add_ingestion_fences
+Create Date: 2026-10-18
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "partition_prices"
+down_revision: Union[str, Sequence[str], None] = "add_ingestion_fences"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen copies of the partition layout at the time of this revision, so
+# later changes to app.services.price_partitions don't alter the upgrade.
+# The maintenance task keeps creating partitions from here on.
+PARTITIONS_AHEAD = 7
+
+
+def _period_start(moment: datetime) -> datetime:
+    return moment.astimezone(timezone.utc).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+
+
+def _next_period(start: datetime) -> datetime:
+    return start + timedelta(days=1)
+
+
+def _create_partitions_ahead(conn, start: datetime) -> None:
+    today = _period_start(datetime.now(timezone.utc))
+    horizon = today + timedelta(days=PARTITIONS_AHEAD + 1)
+    start = max(start, today)
+    while start < horizon:
+        end = _next_period(start)
+        conn.execute(sa.text(
+            f'CREATE TABLE IF NOT EXISTS "prices_p{start:%Y%m%d}" '
+            "PARTITION OF prices "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        ))
+        start = end
+
+
+def _create_prices_table(name: str, *constraints, **kwargs) -> None:
+    op.create_table(
+        name,
+        sa.Column(
+            "id",
+            sa.Integer,
+            nullable=False,
+            autoincrement=False,
+            server_default=sa.text("nextval('prices_id_seq'::regclass)"),
+        ),
+        sa.Column(
+            "token_id",
+            sa.Integer,
+            sa.ForeignKey("tokens.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("price_dex", sa.Float, nullable=False),
+        sa.Column("price_cex", sa.Float, nullable=False),
+        sa.Column("spread", sa.Float),
+        sa.Column(
+            "timestamp",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+        sa.CheckConstraint("price_dex > 0", name="ck_prices_price_dex"),
+        sa.CheckConstraint("price_cex > 0", name="ck_prices_price_cex"),
+        *constraints,
+        **kwargs,
+    )
+
+
+def upgrade() -> None:
+    op.rename_table("prices", "prices_legacy")
+    op.execute("ALTER INDEX prices_pkey RENAME TO prices_legacy_pkey")
+    op.execute(
+        "ALTER INDEX ix_prices_token_id RENAME TO prices_legacy_token_id_idx"
+    )
+    op.execute(
+        "ALTER INDEX ix_prices_timestamp RENAME TO prices_legacy_timestamp_idx"
+    )
+
+    _create_prices_table(
+        "prices",
+        sa.PrimaryKeyConstraint("id", "timestamp", name="prices_pkey"),
+        postgresql_partition_by='RANGE ("timestamp")',
+    )
+    op.execute("ALTER SEQUENCE prices_id_seq OWNED BY prices.id")
+
+    conn = op.get_bind()
+    newest = conn.execute(
+        sa.text('SELECT max("timestamp") FROM prices_legacy')
+    ).scalar()
+    first_partition = datetime.min.replace(tzinfo=timezone.utc)
+    if newest is None:
+        op.drop_table("prices_legacy")
+    else:
+        # The existing heap becomes one partition covering everything up to
+        # the end of its newest period, so no rows are copied. Attaching
+        # builds the (id, timestamp) key and scans the old table once; the
+        # CHECK lets the range validation reuse that scan.
+        legacy_upper = _next_period(_period_start(newest))
+        first_partition = legacy_upper
+        op.drop_constraint("prices_legacy_pkey", "prices_legacy")
+        op.execute(
+            "ALTER TABLE prices_legacy ADD CONSTRAINT prices_legacy_range "
+            f"CHECK (\"timestamp\" < '{legacy_upper.isoformat()}')"
+        )
+        op.execute(
+            "ALTER TABLE prices ATTACH PARTITION prices_legacy "
+            f"FOR VALUES FROM (MINVALUE) TO ('{legacy_upper.isoformat()}')"
+        )
+        op.execute(
+            "ALTER TABLE prices_legacy DROP CONSTRAINT prices_legacy_range"
+        )
+
+    op.create_index("ix_prices_token_id", "prices", ["token_id"])
+    op.create_index("ix_prices_timestamp", "prices", ["timestamp"])
+
+    _create_partitions_ahead(conn, first_partition)
+
+
+def downgrade() -> None:
+    op.rename_table("prices", "prices_partitioned")
+    op.execute("ALTER INDEX prices_pkey RENAME TO prices_partitioned_pkey")
+    op.execute(
+        "ALTER INDEX ix_prices_token_id RENAME TO prices_partitioned_token_id_idx"
+    )
+    op.execute(
+        "ALTER INDEX ix_prices_timestamp "
+        "RENAME TO prices_partitioned_timestamp_idx"
+    )
+
+    _create_prices_table(
+        "prices",
+        sa.PrimaryKeyConstraint("id", name="prices_pkey"),
+    )
+    op.create_index("ix_prices_token_id", "prices", ["token_id"])
+    op.create_index("ix_prices_timestamp", "prices", ["timestamp"])
+    op.execute("ALTER SEQUENCE prices_id_seq OWNED BY prices.id")
+
+    op.execute(
+        "INSERT INTO prices (id, token_id, price_dex, price_cex, spread, "
+        '"timestamp") SELECT id, token_id, price_dex, price_cex, spread, '
+        '"timestamp" FROM prices_partitioned'
+    )
+    op.drop_table("prices_partitioned")
@@ -0,0 +1,241 @@
+import argparse
+import functools
+import json
+import os
+import statistics
+import time
+import uuid
+
+from app.benchmarks.mock_upstream import (
+    CEX,
+    DEX,
+    MockUpstream,
+    MockUpstreamThread,
+    add_profile_arguments,
+    bench_address,
+    bench_symbol,
+    profile_from_args,
+)
+
+SEED_CHUNK_SIZE = 5000
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[pct - 1]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Seed N tokens and run _update_all_tokens against the mock "
+            "upstream with the local Postgres and Redis from DATABASE_URL "
+            "and REDIS_URL. Use a dedicated database: every token in it "
+            "is ingested."
+        ),
+    )
+    parser.add_argument("--tokens", type=int, default=1000)
+    parser.add_argument(
+        "--assets", type=int, default=None,
+        help="distinct assets the tokens are spread over (default: tokens)",
+    )
+    parser.add_argument("--cycles", type=int, default=3)
+    parser.add_argument(
+        "--engine", choices=("async", "sync"),
+        default=os.getenv("INGESTION_ENGINE", "async"),
+    )
+    parser.add_argument(
+        "--deadline", type=float, default=0,
+        help="cycle deadline in seconds, 0 disables it",
+    )
+    parser.add_argument(
+        "--warm-cache", action="store_true",
+        help="keep the shared price cache between cycles",
+    )
+    parser.add_argument("--dex-port", type=int, default=8801)
+    parser.add_argument("--cex-port", type=int, default=8802)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keep", action="store_true",
+                        help="keep the seeded user, tokens and prices")
+    parser.add_argument("--json", action="store_true",
+                        help="print the summary as JSON")
+    add_profile_arguments(parser)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    assets = args.assets or args.tokens
+
+    server = MockUpstreamThread(
+        MockUpstream(
+            profile_from_args(args, DEX),
+            profile_from_args(args, CEX),
+            ticker_symbols=assets,
+            seed=args.seed,
+        ),
+        dex_port=args.dex_port,
+        cex_port=args.cex_port,
+    )
+    server.start()
+
+    # Source URLs, rate limits and the engine are read at import time.
+    os.environ["DEXSCREENER_BASE_URL"] = server.dex_url
+    os.environ["MEXC_CONTRACT_BASE_URL"] = server.cex_url
+    os.environ["INGESTION_ENGINE"] = args.engine
+
+    from sqlalchemy import delete, func, insert, select
+
+    from app.dependencies_sync import get_db
+    from app.models.prices import Price
+    from app.models.token import Token
+    from app.models.users import User
+    from app.services.price_cache import PRICE_CACHE_KEY, local_cache
+    from app.services.redis_clients import get_redis
+    from app.services.source_metrics import DB_WRITE
+    from app.tasks import prices_tasks
+
+    latencies: list[float] = []
+
+    def timed(fetch):
+        @functools.wraps(fetch)
+        def wrapper(*fetch_args, **kwargs):
+            started = time.monotonic()
+            try:
+                return fetch(*fetch_args, **kwargs)
+            finally:
+                latencies.append(time.monotonic() - started)
+        return wrapper
+
+    def timed_async(fetch):
+        @functools.wraps(fetch)
+        async def wrapper(*fetch_args, **kwargs):
+            started = time.monotonic()
+            try:
+                return await fetch(*fetch_args, **kwargs)
+            finally:
+                latencies.append(time.monotonic() - started)
+        return wrapper
+
+    prices_tasks.fetch_asset_price = timed(prices_tasks.fetch_asset_price)
+    prices_tasks.fetch_asset_price_async = timed_async(
+        prices_tasks.fetch_asset_price_async
+    )
+
+    tag = uuid.uuid4().hex[:8]
+    with get_db() as db:
+        user = User(username=f"bench-{tag}", email=f"bench-{tag}@example.com")
+        db.add(user)
+        db.flush()
+        user_id = user.id
+
+        rows = [
+            {
+                "user_id": user_id,
+                "symbol": bench_symbol(index % assets),
+                "chain": "ethereum",
+                "address": bench_address(index % assets),
+                "cex_symbol": bench_symbol(index % assets),
+            }
+            for index in range(args.tokens)
+        ]
+        for start in range(0, len(rows), SEED_CHUNK_SIZE):
+            db.execute(insert(Token), rows[start:start + SEED_CHUNK_SIZE])
+
+        foreign = db.scalar(
+            select(func.count(Token.id)).where(Token.user_id != user_id)
+        )
+    if foreign:
+        print(f"warning: {foreign} pre-existing tokens are ingested too")
+
+    def stored_rows() -> int:
+        with get_db() as db:
+            return db.scalar(
+                select(func.count(Price.id))
+                .join(Token, Token.id == Price.token_id)
+                .where(Token.user_id == user_id)
+            )
+
+    def clear_price_cache() -> None:
+        local_cache.clear()
+        redis_client = get_redis()
+        keys = list(redis_client.scan_iter(PRICE_CACHE_KEY.format("*", "*")))
+        if keys:
+            redis_client.delete(*keys)
+
+    cycles = []
+    try:
+        for number in range(1, args.cycles + 1):
+            if not args.warm_cache:
+                clear_price_cache()
+            latencies.clear()
+            before = stored_rows()
+
+            started = time.monotonic()
+            result = prices_tasks._update_all_tokens(
+                cycle_deadline=args.deadline,
+            )
+            elapsed = time.monotonic() - started
+
+            written = stored_rows() - before
+            db_write = result.get("sources", {}).get(DB_WRITE, {})
+            db_seconds = db_write.get("latency", {}).get("sum_ms", 0) / 1000
+            cycle = {
+                "cycle": number,
+                "status": result.get("status"),
+                "seconds": round(elapsed, 3),
+                "tokens": result.get("total", 0),
+                "success": result.get("success", 0),
+                "error": result.get("error", 0),
+                "deferred": result.get("deferred", 0),
+                "tokens_per_sec": round(result.get("success", 0) / elapsed, 1),
+                "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+                "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+                "rows_written": written,
+                "db_writes_per_sec": round(written / elapsed, 1),
+                "db_insert_rows_per_sec": (
+                    round(written / db_seconds, 1) if db_seconds else None
+                ),
+            }
+            cycles.append(cycle)
+            if not args.json:
+                print(
+                    f"cycle {number}: {cycle['seconds']:.2f}s "
+                    f"{cycle['tokens_per_sec']:.1f} tokens/s "
+                    f"p50 {cycle['p50_ms']:.1f}ms p99 {cycle['p99_ms']:.1f}ms "
+                    f"{cycle['db_writes_per_sec']:.1f} writes/s "
+                    f"({cycle['success']} ok, {cycle['error']} errors, "
+                    f"{cycle['deferred']} deferred)"
+                )
+    finally:
+        prices_tasks.close_worker_clients()
+        server.stop()
+        if not args.keep:
+            with get_db() as db:
+                db.execute(delete(User).where(User.id == user_id))
+
+    summary = {
+        "engine": args.engine,
+        "tokens": args.tokens,
+        "assets": assets,
+        "cycles": cycles,
+        "median_tokens_per_sec": statistics.median(
+            cycle["tokens_per_sec"] for cycle in cycles
+        ),
+        "upstream": server.upstream.stats(),
+    }
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print(
+            f"{args.engine} engine, {args.tokens} tokens over {assets} assets: "
+            f"median {summary['median_tokens_per_sec']:.1f} tokens/s, "
+            f"upstream {summary['upstream']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
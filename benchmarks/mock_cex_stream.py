@@ -0,0 +1,180 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Optional
+
+from websockets.asyncio.server import ServerConnection, serve
+from websockets.exceptions import ConnectionClosed
+
+from app.benchmarks.mock_upstream import base_price, bench_symbol
+from app.services.cex_stream import CexPriceStream, PriceBoard
+
+BAD_FRAMES = (
+    "not json",
+    "[1, 2, 3]",
+    '"push.ticker"',
+    json.dumps({
+        "channel": "push.ticker",
+        "data": {"symbol": "BNC0_USDT", "indexPrice": "n/a"},
+    }),
+    json.dumps({"channel": "push.ticker", "data": ["BNC0_USDT", 1.0]}),
+)
+
+
+class MockTickerStream:
+    def __init__(
+        self,
+        push_interval: float = 0.5,
+        bad_frame_rate: float = 0.0,
+        jitter_pct: float = 0.5,
+        seed: Optional[int] = None,
+    ):
+        self.push_interval = push_interval
+        self.bad_frame_rate = bad_frame_rate
+        self.jitter_pct = jitter_pct
+        self.rng = random.Random(seed)
+        self.connections: set[ServerConnection] = set()
+        self.accepted = 0
+        self.pushed = 0
+        self.bad_frames = 0
+
+    def _ticker(self, contract_symbol: str) -> str:
+        base = contract_symbol.removesuffix("_USDT")
+        jitter = self.rng.uniform(-self.jitter_pct, self.jitter_pct) / 100
+        price = round(base_price(base) * (1 + jitter), 8)
+        return json.dumps({
+            "channel": "push.ticker",
+            "symbol": contract_symbol,
+            "data": {
+                "symbol": contract_symbol,
+                "indexPrice": price,
+                "lastPrice": price,
+            },
+            "ts": int(time.time() * 1000),
+        })
+
+    async def _push(self, ws: ServerConnection, subscribed: set[str]) -> None:
+        while True:
+            await asyncio.sleep(self.push_interval)
+            for contract_symbol in list(subscribed):
+                if self.rng.random() < self.bad_frame_rate:
+                    await ws.send(self.rng.choice(BAD_FRAMES))
+                    self.bad_frames += 1
+                await ws.send(self._ticker(contract_symbol))
+                self.pushed += 1
+
+    async def handler(self, ws: ServerConnection) -> None:
+        self.connections.add(ws)
+        self.accepted += 1
+        subscribed: set[str] = set()
+        pusher = asyncio.create_task(self._push(ws, subscribed))
+        try:
+            async for raw in ws:
+                message = json.loads(raw)
+                method = message.get("method")
+                symbol = (message.get("param") or {}).get("symbol")
+                if method == "sub.ticker":
+                    subscribed.add(symbol)
+                    await ws.send(json.dumps(
+                        {"channel": "rs.sub.ticker", "data": "success"}
+                    ))
+                elif method == "unsub.ticker":
+                    subscribed.discard(symbol)
+                    await ws.send(json.dumps(
+                        {"channel": "rs.unsub.ticker", "data": "success"}
+                    ))
+                elif method == "ping":
+                    await ws.send(json.dumps({
+                        "channel": "pong",
+                        "data": int(time.time() * 1000),
+                    }))
+        except ConnectionClosed:
+            pass
+        finally:
+            pusher.cancel()
+            self.connections.discard(ws)
+
+    async def disconnect_all(self) -> None:
+        for ws in list(self.connections):
+            await ws.close()
+
+
+async def check_stream(args: argparse.Namespace) -> dict:
+    stand_in = MockTickerStream(
+        push_interval=args.push_interval,
+        bad_frame_rate=args.bad_frame_rate,
+        seed=args.seed,
+    )
+    tracked = {bench_symbol(index) for index in range(args.symbols)}
+
+    async def load_symbols() -> set[str]:
+        return set(tracked)
+
+    async with serve(stand_in.handler, args.host, args.port):
+        stream = CexPriceStream(
+            PriceBoard(),
+            symbol_loader=load_symbols,
+            url=f"ws://{args.host}:{args.port}",
+            resync_interval=args.resync_interval,
+            ping_interval=args.ping_interval,
+        )
+        task = asyncio.create_task(stream.run())
+
+        started = time.monotonic()
+        next_disconnect = started + args.disconnect_every
+        while time.monotonic() - started < args.seconds:
+            await asyncio.sleep(0.1)
+            if task.done():
+                break
+            if args.disconnect_every and time.monotonic() >= next_disconnect:
+                await stand_in.disconnect_all()
+                next_disconnect += args.disconnect_every
+
+        survived = not task.done()
+        stream.stop()
+        await task
+
+    board = stream.board.snapshot()
+    return {
+        "survived": survived,
+        "tracked": len(tracked),
+        "on_board": len(board),
+        "missing": sorted(tracked - set(board))[:10],
+        "connections": stand_in.accepted,
+        "pushed": stand_in.pushed,
+        "bad_frames": stand_in.bad_frames,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=(
+            "Run CexPriceStream against a local sub.ticker/push.ticker "
+            "stand-in with malformed frames and forced disconnects"
+        ),
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8803)
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--push-interval", type=float, default=0.5)
+    parser.add_argument("--bad-frame-rate", type=float, default=0.01)
+    parser.add_argument(
+        "--disconnect-every", type=float, default=4,
+        help="close every connection this often, 0 disables it",
+    )
+    parser.add_argument("--resync-interval", type=float, default=30)
+    parser.add_argument("--ping-interval", type=float, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    result = asyncio.run(check_stream(args))
+    print(json.dumps(result, indent=2))
+    if not result["survived"] or result["on_board"] < result["tracked"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
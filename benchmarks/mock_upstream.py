@@ -0,0 +1,298 @@
+import argparse
+import asyncio
+import hashlib
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from aiohttp import web
+
+DEX = "dex"
+CEX = "cex"
+
+
+@dataclass
+class UpstreamProfile:
+    latency_ms: float = 80.0
+    latency_sigma: float = 0.5
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    retry_after: int = 1
+
+    def sample_latency(self, rng: random.Random) -> float:
+        if self.latency_ms <= 0:
+            return 0.0
+        return rng.lognormvariate(0, self.latency_sigma) * self.latency_ms / 1000
+
+
+def bench_address(index: int) -> str:
+    return f"0x{index:040x}"
+
+
+def bench_symbol(index: int) -> str:
+    return f"BNC{index}"
+
+
+def base_price(key: str) -> float:
+    digest = hashlib.md5(key.lower().encode()).digest()
+    return 0.01 + int.from_bytes(digest[:4], "big") % 1_000_000 / 100
+
+
+class MockUpstream:
+    def __init__(
+        self,
+        dex: UpstreamProfile,
+        cex: UpstreamProfile,
+        ticker_symbols: int = 0,
+        jitter_pct: float = 0.5,
+        seed: Optional[int] = None,
+    ):
+        self.profiles = {DEX: dex, CEX: cex}
+        self.ticker_symbols = ticker_symbols
+        self.jitter_pct = jitter_pct
+        self.rng = random.Random(seed)
+        self.requests = {DEX: 0, CEX: 0}
+        self.throttled = {DEX: 0, CEX: 0}
+        self.errors = {DEX: 0, CEX: 0}
+
+    def price(self, key: str) -> float:
+        jitter = self.rng.uniform(-self.jitter_pct, self.jitter_pct) / 100
+        return round(base_price(key) * (1 + jitter), 8)
+
+    async def _behave(self, upstream: str) -> Optional[web.Response]:
+        profile = self.profiles[upstream]
+        self.requests[upstream] += 1
+        await asyncio.sleep(profile.sample_latency(self.rng))
+
+        roll = self.rng.random()
+        if roll < profile.throttle_rate:
+            self.throttled[upstream] += 1
+            return web.json_response(
+                {"error": "rate limited"},
+                status=429,
+                headers={"Retry-After": str(profile.retry_after)},
+            )
+        if roll < profile.throttle_rate + profile.error_rate:
+            self.errors[upstream] += 1
+            return web.json_response(
+                {"error": "upstream error"},
+                status=self.rng.choice((500, 502, 503)),
+            )
+        return None
+
+    async def dex_tokens(self, request: web.Request) -> web.Response:
+        failure = await self._behave(DEX)
+        if failure is not None:
+            return failure
+
+        addresses = [
+            address for address in request.match_info["addresses"].split(",")
+            if address
+        ]
+        pairs = [
+            {
+                "chainId": "ethereum",
+                "dexId": "uniswap",
+                "pairAddress": f"0x{index:040x}",
+                "baseToken": {"address": address, "symbol": "BNC"},
+                "quoteToken": {"symbol": "USDC"},
+                "priceUsd": f"{self.price(address):.8f}",
+                "liquidity": {"usd": 250_000 + index},
+                "volume": {"h24": 120_000 + index},
+            }
+            for index, address in enumerate(addresses)
+        ]
+        return web.json_response({"schemaVersion": "1.0.0", "pairs": pairs})
+
+    async def cex_index_price(self, request: web.Request) -> web.Response:
+        failure = await self._behave(CEX)
+        if failure is not None:
+            return failure
+
+        symbol = request.match_info["symbol"].upper()
+        base = symbol.removesuffix("_USDT")
+        return web.json_response({
+            "success": True,
+            "code": 0,
+            "data": {
+                "symbol": symbol,
+                "indexPrice": self.price(base),
+                "timestamp": int(time.time() * 1000),
+            },
+        })
+
+    async def cex_ticker(self, request: web.Request) -> web.Response:
+        failure = await self._behave(CEX)
+        if failure is not None:
+            return failure
+
+        tickers = []
+        for index in range(self.ticker_symbols):
+            base = bench_symbol(index)
+            price = self.price(base)
+            tickers.append({
+                "symbol": f"{base}_USDT",
+                "lastPrice": price,
+                "indexPrice": price,
+                "amount24": 1_000_000,
+            })
+        return web.json_response({"success": True, "code": 0, "data": tickers})
+
+    def dex_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/latest/dex/tokens/{addresses}", self.dex_tokens)
+        return app
+
+    def cex_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get(
+            "/api/v1/contract/index_price/{symbol}",
+            self.cex_index_price,
+        )
+        app.router.add_get("/api/v1/contract/ticker", self.cex_ticker)
+        return app
+
+    def stats(self) -> dict:
+        return {
+            upstream: {
+                "requests": self.requests[upstream],
+                "throttled": self.throttled[upstream],
+                "errors": self.errors[upstream],
+            }
+            for upstream in (DEX, CEX)
+        }
+
+
+async def start_servers(
+    upstream: MockUpstream,
+    host: str,
+    dex_port: int,
+    cex_port: int,
+) -> list[web.AppRunner]:
+    runners = []
+    for app, port in (
+        (upstream.dex_app(), dex_port),
+        (upstream.cex_app(), cex_port),
+    ):
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, host, port).start()
+        runners.append(runner)
+    return runners
+
+
+class MockUpstreamThread(threading.Thread):
+    def __init__(
+        self,
+        upstream: MockUpstream,
+        host: str = "127.0.0.1",
+        dex_port: int = 8801,
+        cex_port: int = 8802,
+    ):
+        super().__init__(name="mock-upstream", daemon=True)
+        self.upstream = upstream
+        self.host = host
+        self.dex_port = dex_port
+        self.cex_port = cex_port
+        self.loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._runners: list[web.AppRunner] = []
+
+    @property
+    def dex_url(self) -> str:
+        return f"http://{self.host}:{self.dex_port}"
+
+    @property
+    def cex_url(self) -> str:
+        return f"http://{self.host}:{self.cex_port}"
+
+    def run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self._runners = self.loop.run_until_complete(start_servers(
+            self.upstream, self.host, self.dex_port, self.cex_port,
+        ))
+        self._ready.set()
+        self.loop.run_forever()
+
+        for runner in self._runners:
+            self.loop.run_until_complete(runner.cleanup())
+        self.loop.close()
+
+    def start(self) -> None:
+        super().start()
+        self._ready.wait()
+
+    def stop(self) -> None:
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.join()
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser) -> None:
+    for upstream in (DEX, CEX):
+        parser.add_argument(
+            f"--{upstream}-latency-ms", type=float, default=80.0,
+            help=f"median {upstream.upper()} response latency",
+        )
+        parser.add_argument(
+            f"--{upstream}-latency-sigma", type=float, default=0.5,
+            help="lognormal sigma of the latency distribution",
+        )
+        parser.add_argument(
+            f"--{upstream}-error-rate", type=float, default=0.0,
+            help="fraction of requests answered with a 5xx",
+        )
+        parser.add_argument(
+            f"--{upstream}-throttle-rate", type=float, default=0.0,
+            help="fraction of requests answered with a 429",
+        )
+
+
+def profile_from_args(args: argparse.Namespace, upstream: str) -> UpstreamProfile:
+    return UpstreamProfile(
+        latency_ms=getattr(args, f"{upstream}_latency_ms"),
+        latency_sigma=getattr(args, f"{upstream}_latency_sigma"),
+        error_rate=getattr(args, f"{upstream}_error_rate"),
+        throttle_rate=getattr(args, f"{upstream}_throttle_rate"),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Stand-in DexScreener and MEXC contract APIs",
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--dex-port", type=int, default=8801)
+    parser.add_argument("--cex-port", type=int, default=8802)
+    parser.add_argument(
+        "--ticker-symbols", type=int, default=1000,
+        help="number of BNC<n>_USDT contracts in the ticker snapshot",
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    server = MockUpstreamThread(
+        MockUpstream(
+            profile_from_args(args, DEX),
+            profile_from_args(args, CEX),
+            ticker_symbols=args.ticker_symbols,
+            seed=args.seed,
+        ),
+        args.host,
+        args.dex_port,
+        args.cex_port,
+    )
+    server.start()
+    print(f"DEXSCREENER_BASE_URL={server.dex_url}")
+    print(f"MEXC_CONTRACT_BASE_URL={server.cex_url}")
+    try:
+        server.join()
+    except KeyboardInterrupt:
+        server.stop()
+        print(server.upstream.stats())
+
+
+if __name__ == "__main__":
+    main()
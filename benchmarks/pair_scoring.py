@@ -0,0 +1,162 @@
+import random
+import timeit
+
+from app.services.pair_scoring import W_LIQUIDITY, W_VOLUME, select_best_pair
+
+PAIR_COUNTS = (10, 100, 500)
+QUOTES = ("USDC", "USDT", "WETH", "SOL", "DAI")
+REPEAT = 5
+
+
+def select_best_pair_loop(
+    pairs,
+    preferred_quote=("USDC", "USDT"),
+    min_liquidity=10000,
+    min_volume=5000,
+):
+    best_pair = None
+    best_score = 0
+
+    for pair in pairs:
+        liquidity = float(pair.get("liquidity", {}).get("usd") or 0)
+        volume = float(pair.get("volume", {}).get("h24") or 0)
+
+        if liquidity < min_liquidity or volume < min_volume:
+            continue
+
+        quote_symbol = pair.get("quoteToken", {}).get("symbol", "")
+
+        score = liquidity * W_LIQUIDITY + volume * W_VOLUME
+
+        if quote_symbol in preferred_quote:
+            score *= 1.2
+
+        if score > best_score:
+            best_score = score
+            best_pair = {
+                "chainId": pair.get("chainId"),
+                "dexId": pair.get("dexId"),
+                "pairAddress": pair.get("pairAddress"),
+                "base": pair.get("baseToken", {}).get("symbol"),
+                "quote": quote_symbol,
+                "liquidity_usd": liquidity,
+                "volume_24h": volume,
+                "price_usd": pair.get("priceUsd"),
+                "score": round(score, 2),
+            }
+
+    return best_pair
+
+
+def make_pairs(count: int, rng: random.Random) -> list[dict]:
+    return [
+        {
+            "chainId": "ethereum",
+            "dexId": "uniswap",
+            "pairAddress": f"0x{index:040x}",
+            "baseToken": {"symbol": "WETH"},
+            "quoteToken": {"symbol": rng.choice(QUOTES)},
+            "liquidity": {"usd": rng.lognormvariate(11, 2)},
+            "volume": {"h24": str(rng.lognormvariate(10, 2))},
+            "priceUsd": f"{rng.uniform(3000, 3100):.2f}",
+        }
+        for index in range(count)
+    ]
+
+
+def make_pair(index: int, quote: str, liquidity, volume) -> dict:
+    return {
+        "chainId": "ethereum",
+        "dexId": "uniswap",
+        "pairAddress": f"0x{index:040x}",
+        "baseToken": {"symbol": "WETH"},
+        "quoteToken": {"symbol": quote},
+        "liquidity": {"usd": liquidity},
+        "volume": {"h24": volume},
+        "priceUsd": f"{3000 + index}.00",
+    }
+
+
+def edge_cases() -> list[tuple[str, list[dict], dict]]:
+    # Inputs where pruning on the boosted score could pick a different
+    # pair than the original loop if it were off by one comparison.
+    return [
+        ("empty", [], {}),
+        ("all below the minimums", [
+            make_pair(0, "USDC", 9999, 1e6),
+            make_pair(1, "USDT", 1e6, 4999),
+        ], {}),
+        ("zero liquidity and volume", [
+            make_pair(0, "USDC", 0, 0),
+            make_pair(1, "WETH", None, None),
+            make_pair(2, "SOL", "0", "0"),
+        ], {"min_liquidity": 0, "min_volume": 0}),
+        ("missing liquidity and volume", [
+            {"pairAddress": "0x0", "quoteToken": {"symbol": "USDC"}},
+            {"pairAddress": "0x1", "liquidity": {}, "volume": {}},
+        ], {"min_liquidity": 0, "min_volume": 0}),
+        ("equal scores keep the first", [
+            make_pair(0, "WETH", 50000, 20000),
+            make_pair(1, "SOL", 50000, 20000),
+            make_pair(2, "DAI", "50000", "20000"),
+        ], {}),
+        ("equal boosted scores keep the first", [
+            make_pair(0, "USDC", 50000, 20000),
+            make_pair(1, "USDT", 50000, 20000),
+        ], {}),
+        ("preferred quote exactly ties an earlier pair", [
+            make_pair(0, "WETH", 12000, 12000),
+            make_pair(1, "USDC", 10000, 10000),
+        ], {}),
+        ("preferred quote overtakes a larger pair", [
+            make_pair(0, "WETH", 55000, 20000),
+            make_pair(1, "USDC", 50000, 20000),
+        ], {}),
+        ("unboosted pair exactly ties an earlier boosted one", [
+            make_pair(0, "USDC", 10000, 10000),
+            make_pair(1, "WETH", 12000, 12000),
+        ], {}),
+        ("only the exact minimums", [
+            make_pair(0, "WETH", 10000, 5000),
+        ], {}),
+    ]
+
+
+def check_edge_cases() -> None:
+    for name, pairs, kwargs in edge_cases():
+        expected = select_best_pair_loop(pairs, **kwargs)
+        actual = select_best_pair(pairs, **kwargs)
+        assert actual == expected, f"{name}: {actual} != {expected}"
+    print(f"{len(edge_cases())} edge cases pick the same pair as the loop")
+
+
+def main():
+    check_edge_cases()
+
+    rng = random.Random(42)
+    print(f"{'pairs':>6} {'loop, us':>10} {'shared, us':>10} {'speedup':>8}")
+
+    for count in PAIR_COUNTS:
+        pairs = make_pairs(count, rng)
+        assert select_best_pair(pairs) == select_best_pair_loop(pairs)
+
+        number = max(1, 20000 // count)
+        loop_time = min(timeit.repeat(
+            lambda: select_best_pair_loop(pairs),
+            number=number,
+            repeat=REPEAT,
+        )) / number
+        shared_time = min(timeit.repeat(
+            lambda: select_best_pair(pairs),
+            number=number,
+            repeat=REPEAT,
+        )) / number
+
+        print(
+            f"{count:>6} {loop_time * 1e6:>10.1f} "
+            f"{shared_time * 1e6:>10.1f} {loop_time / shared_time:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+import argparse
+import json
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, select, text
+
+from app.crud.prices import latest_prices_query, price_history_query
+from app.dependencies_sync import engine, get_db
+from app.models.token import Token
+from app.models.users import User
+from app.services.price_partitions import create_partitions, next_period
+
+SEED_TOKENS_PER_BATCH = 50
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Seed a large prices history and show that latest-N and "
+            "time-range reads run as index-only scans on "
+            "ix_prices_token_id_timestamp."
+        ),
+    )
+    parser.add_argument("--tokens", type=int, default=1000)
+    parser.add_argument("--rows-per-token", type=int, default=20000)
+    parser.add_argument(
+        "--step-seconds", type=int, default=10,
+        help="spacing between a token's prices",
+    )
+    parser.add_argument(
+        "--user-id", type=int, default=None,
+        help="reuse the tokens of a previously kept benchmark user",
+    )
+    parser.add_argument("--samples", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--window-hours", type=float, default=6)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keep", action="store_true",
+                        help="keep the seeded user, tokens and prices")
+    return parser.parse_args()
+
+
+def seed(args: argparse.Namespace, now: datetime) -> int:
+    tag = uuid.uuid4().hex[:8]
+    with get_db() as db:
+        user = User(username=f"bench-{tag}", email=f"bench-{tag}@example.com")
+        db.add(user)
+        db.flush()
+        user_id = user.id
+        db.execute(
+            text(
+                "INSERT INTO tokens "
+                "(user_id, symbol, chain, address, cex_symbol, created_at) "
+                "SELECT :user_id, 'BNC' || g, 'ethereum', "
+                "'0x' || lpad(to_hex(g), 40, '0'), 'BNC' || g, now() "
+                "FROM generate_series(0, :count - 1) AS g"
+            ),
+            {"user_id": user_id, "count": args.tokens},
+        )
+
+        oldest = now - timedelta(
+            seconds=args.step_seconds * args.rows_per_token
+        )
+        created = create_partitions(db.connection(), oldest, next_period(now))
+        if created:
+            print(f"created {len(created)} partitions for the history")
+
+    token_ids = load_token_ids(user_id)
+    started = time.monotonic()
+    for start in range(0, len(token_ids), SEED_TOKENS_PER_BATCH):
+        batch = token_ids[start:start + SEED_TOKENS_PER_BATCH]
+        with get_db() as db:
+            db.execute(
+                text(
+                    "INSERT INTO prices "
+                    "(token_id, price_dex, price_cex, spread, \"timestamp\") "
+                    "SELECT t.id, p.dex, p.cex, "
+                    "abs(p.dex - p.cex) / p.cex * 100, "
+                    ":now - make_interval(secs => s * :step) "
+                    "FROM unnest(CAST(:token_ids AS integer[])) AS t(id) "
+                    "CROSS JOIN generate_series(0, :rows - 1) AS s "
+                    "CROSS JOIN LATERAL (SELECT 1 + random() AS dex, "
+                    "1 + random() AS cex) AS p"
+                ),
+                {
+                    "now": now,
+                    "step": args.step_seconds,
+                    "rows": args.rows_per_token,
+                    "token_ids": batch,
+                },
+            )
+        done = start + len(batch)
+        print(
+            f"\rseeded {done * args.rows_per_token:,} rows "
+            f"({time.monotonic() - started:.0f}s)",
+            end="",
+            flush=True,
+        )
+    print()
+
+    # Index-only scans need an up-to-date visibility map.
+    with engine.connect().execution_options(
+        isolation_level="AUTOCOMMIT"
+    ) as conn:
+        conn.execute(text("VACUUM (ANALYZE) prices"))
+    return user_id
+
+
+def load_token_ids(user_id: int) -> list[int]:
+    with get_db() as db:
+        return list(db.scalars(
+            select(Token.id).where(Token.user_id == user_id).order_by(Token.id)
+        ))
+
+
+def plan_nodes(plan: dict) -> list[dict]:
+    nodes = [plan]
+    for child in plan.get("Plans", []):
+        nodes.extend(plan_nodes(child))
+    return nodes
+
+
+def explain(stmt) -> dict:
+    with engine.connect() as conn:
+        compiled = stmt.compile(dialect=conn.dialect)
+        raw = conn.exec_driver_sql(
+            f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {compiled}",
+            compiled.params,
+        ).scalar()
+    plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]
+
+    scans = [
+        node for node in plan_nodes(plan["Plan"])
+        if "Scan" in node["Node Type"]
+    ]
+    return {
+        "execution_ms": plan["Execution Time"],
+        "scans": sorted({node["Node Type"] for node in scans}),
+        "partitions": len(scans),
+        "heap_fetches": sum(node.get("Heap Fetches", 0) for node in scans),
+        "shared_hit": plan["Plan"].get("Shared Hit Blocks", 0),
+        "shared_read": plan["Plan"].get("Shared Read Blocks", 0),
+    }
+
+
+def measure(name: str, queries: list) -> None:
+    latencies = []
+    with engine.connect() as conn:
+        for stmt in queries:
+            started = time.perf_counter()
+            conn.execute(stmt).all()
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    quantiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    plan = explain(queries[0])
+    print(f"{name}:")
+    print(
+        f"  {len(latencies)} runs: p50 {quantiles[49]:.2f}ms "
+        f"p99 {quantiles[98]:.2f}ms"
+    )
+    print(
+        f"  plan: {', '.join(plan['scans'])} on {plan['partitions']} "
+        f"partition(s) after pruning, heap fetches {plan['heap_fetches']}, "
+        f"buffers hit {plan['shared_hit']} read {plan['shared_read']}, "
+        f"{plan['execution_ms']:.2f}ms"
+    )
+
+
+def main():
+    args = parse_args()
+    rng = random.Random(args.seed)
+    now = datetime.now(timezone.utc)
+
+    user_id = args.user_id
+    if user_id is None:
+        user_id = seed(args, now)
+
+    try:
+        token_ids = load_token_ids(user_id)
+        with engine.connect() as conn:
+            total = conn.execute(text(
+                "SELECT coalesce(sum(child.reltuples), 0)::bigint "
+                "FROM pg_inherits "
+                "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "WHERE parent.relname = 'prices'"
+            )).scalar()
+        print(f"{len(token_ids)} tokens, ~{total:,} rows in prices")
+
+        samples = [rng.choice(token_ids) for _ in range(args.samples)]
+        window_start = now - timedelta(hours=args.window_hours)
+        measure(
+            f"latest {args.limit}",
+            [latest_prices_query(token_id, args.limit) for token_id in samples],
+        )
+        measure(
+            f"latest {args.limit} since window start",
+            [
+                latest_prices_query(token_id, args.limit, since=window_start)
+                for token_id in samples
+            ],
+        )
+        measure(
+            f"history over {args.window_hours:g}h",
+            [
+                price_history_query(token_id, window_start, now)
+                for token_id in samples
+            ],
+        )
+    finally:
+        if args.keep or args.user_id is not None:
+            print(f"kept benchmark data, rerun with --user-id {user_id}")
+        else:
+            print("deleting benchmark data...")
+            with get_db() as db:
+                db.execute(delete(User).where(User.id == user_id))
+
+
+if __name__ == "__main__":
+    main()
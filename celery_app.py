@@ -51,6 +51,16 @@ celery_app.conf.update(
                 "expires": 50,
             },
         },
+        "maintain-price-partitions": {
+            "task": "maintain_price_partitions_task",
+            "schedule": float(
+                os.getenv("PRICE_PARTITION_MAINTENANCE_INTERVAL", "3600")
+            ),
+            "options": {
+                "queue": "default",
+                "expires": 600,
+            },
+        },
     },
 )
 
@@ -1,7 +1,23 @@
+from datetime import datetime
+from typing import Optional, Sequence
+
+from sqlalchemy import Row, Select, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.prices import Price
 
+MAX_LIMIT = 1000
+
+# Only columns stored in ix_prices_token_id_timestamp, so both reads below
+# are answered by index-only scans.
+PRICE_POINT_COLUMNS = (
+    Price.token_id,
+    Price.timestamp,
+    Price.price_dex,
+    Price.price_cex,
+    Price.spread,
+)
+
 
 async def create_price(db: AsyncSession,
                        price: Price) -> Price:
@@ -9,3 +25,70 @@ async def create_price(db: AsyncSession,
     await db.commit()
     await db.refresh(price)
     return price
+
+
+def latest_prices_query(
+    token_id: int,
+    limit: int = 1,
+    since: Optional[datetime] = None,
+) -> Select:
+    stmt = (
+        select(*PRICE_POINT_COLUMNS)
+        .where(Price.token_id == token_id)
+        .order_by(Price.timestamp.desc())
+        .limit(min(limit, MAX_LIMIT))
+    )
+    if since is not None:
+        # Lets the planner prune partitions older than the bound.
+        stmt = stmt.where(Price.timestamp >= since)
+    return stmt
+
+
+def price_history_query(
+    token_id: int,
+    start: datetime,
+    end: Optional[datetime] = None,
+    limit: Optional[int] = None,
+) -> Select:
+    stmt = (
+        select(*PRICE_POINT_COLUMNS)
+        .where(Price.token_id == token_id, Price.timestamp >= start)
+        .order_by(Price.timestamp.desc())
+    )
+    if end is not None:
+        stmt = stmt.where(Price.timestamp < end)
+    if limit is not None:
+        stmt = stmt.limit(min(limit, MAX_LIMIT))
+    return stmt
+
+
+async def get_latest_prices(
+    db: AsyncSession,
+    token_id: int,
+    limit: int = 1,
+    since: Optional[datetime] = None,
+) -> Sequence[Row]:
+    result = await db.execute(latest_prices_query(token_id, limit, since))
+    return result.all()
+
+
+async def get_latest_price(
+    db: AsyncSession,
+    token_id: int,
+    since: Optional[datetime] = None,
+) -> Optional[Row]:
+    rows = await get_latest_prices(db, token_id, limit=1, since=since)
+    return rows[0] if rows else None
+
+
+async def get_price_history(
+    db: AsyncSession,
+    token_id: int,
+    start: datetime,
+    end: Optional[datetime] = None,
+    limit: Optional[int] = None,
+) -> Sequence[Row]:
+    result = await db.execute(
+        price_history_query(token_id, start, end, limit)
+    )
+    return result.all()
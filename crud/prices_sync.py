@@ -1,9 +1,70 @@
+from typing import Optional, Sequence
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
+from app.models.ingestion_fence import IngestionFence
 from app.models.prices import Price
 
+BULK_INSERT_CHUNK_SIZE = 1000
+
+
+class StaleFencingToken(Exception):
+    def __init__(self, lock_key: str, token: int, current: int):
+        super().__init__(
+            f"Fencing token {token} for {lock_key} is no longer current "
+            f"(database has {current})"
+        )
+        self.lock_key = lock_key
+        self.token = token
+        self.current = current
+
 
 def create_price(db: Session, price: Price) -> Price:
     db.add(price)
     db.commit()
     db.refresh(price)
     return price
+
+
+def check_fencing_token(db: Session, lock_key: str, token: int) -> None:
+    stmt = pg_insert(IngestionFence).values(lock_key=lock_key, token=token)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[IngestionFence.lock_key],
+        set_={"token": stmt.excluded.token, "updated_at": func.now()},
+        where=IngestionFence.token <= stmt.excluded.token,
+    ).returning(IngestionFence.token)
+
+    if db.execute(stmt).scalar_one_or_none() is None:
+        db.rollback()
+        raise StaleFencingToken(
+            lock_key, token, get_fencing_token(db, lock_key)
+        )
+
+
+def get_fencing_token(db: Session, lock_key: str) -> int:
+    stmt = select(IngestionFence.token).where(
+        IngestionFence.lock_key == lock_key
+    )
+    return db.execute(stmt).scalar_one_or_none() or 0
+
+
+def create_prices(
+    db: Session,
+    rows: Sequence[dict],
+    chunk_size: int = BULK_INSERT_CHUNK_SIZE,
+    fence: Optional[tuple[str, int]] = None,
+) -> list[int]:
+    if fence is not None:
+        check_fencing_token(db, *fence)
+
+    price_ids: list[int] = []
+    stmt = insert(Price).returning(Price.id)
+
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        result = db.execute(stmt, chunk)
+        price_ids.extend(result.scalars().all())
+
+    db.commit()
+    return price_ids
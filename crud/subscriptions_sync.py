@@ -0,0 +1,12 @@
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.subscriptions import Subscription
+
+
+def get_subscription_thresholds(db: Session) -> dict[str, list[float]]:
+    stmt = select(Subscription.token, Subscription.threshold)
+    thresholds: dict[str, list[float]] = {}
+    for token, threshold in db.execute(stmt):
+        thresholds.setdefault(token.upper(), []).append(threshold)
+    return thresholds
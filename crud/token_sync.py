@@ -5,7 +5,7 @@ from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.models.token import Token
-from app.schemas.token import TokenCreate
+from app.schemas.token import TokenCreate, TokenRecord
 
 MAX_LIMIT = 100
 
@@ -50,6 +50,17 @@ def get_token_from_db_for_id(
     return result.scalar_one_or_none()
 
 
+def get_token_records(db: Session) -> list[TokenRecord]:
+    stmt = select(
+        Token.id,
+        Token.chain,
+        Token.address,
+        Token.cex_symbol,
+    ).order_by(Token.id)
+    result = db.execute(stmt)
+    return [TokenRecord(*row) for row in result]
+
+
 def delete_token_from_db(
     db: Session,
     value: str,
@@ -1,13 +1,33 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from app.routers import users, prices, token, subscriptions
 
 from app.routers.admin import token as token_admin
 from app.routers.admin import users as users_admin
+from app.routers.admin import metrics as metrics_admin
+from app.services.http_clients import (
+    close_async_http_session,
+    close_http_session,
+    get_async_http_session,
+)
+from app.services.redis_clients import close_async_redis
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    get_async_http_session()
+    yield
+    await close_async_http_session()
+    await close_async_redis()
+    close_http_session()
+
 
-app = FastAPI(title="Crypto Price Tracker API")
+app = FastAPI(title="Crypto Price Tracker API", lifespan=lifespan)
 app.include_router(users.router)
 app.include_router(prices.router)
 app.include_router(token.router)
 app.include_router(subscriptions.router)
 app.include_router(token_admin.router)
 app.include_router(users_admin.router)
+app.include_router(metrics_admin.router)
@@ -1,3 +1,4 @@
 from app.models.users import User
 from app.models.subscriptions import Subscription
 from app.models.token import Token
+from app.models.ingestion_fence import IngestionFence
@@ -8,11 +8,19 @@ from sqlalchemy.orm import relationship
 
 class Price(Base):
     __tablename__ = "prices"
+    __table_args__ = (
+        sa.Index(
+            "ix_prices_token_id_timestamp",
+            "token_id",
+            sa.desc(sa.column("timestamp")),
+            postgresql_include=["price_dex", "price_cex", "spread"],
+        ),
+        {"postgresql_partition_by": 'RANGE ("timestamp")'},
+    )
 
-    id: Mapped[int] = mapped_column(primary_key=True)
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     token_id: Mapped[int] = mapped_column(
         sa.ForeignKey("tokens.id", ondelete="CASCADE"),
-        index=True
     )
 
     price_dex: Mapped[float] = mapped_column(
@@ -28,6 +36,7 @@ class Price(Base):
 
     spread: Mapped[float | None] = mapped_column(Float)
     timestamp: Mapped[datetime] = mapped_column(
+        primary_key=True,
         default=lambda: datetime.now(),
         index=True
     )
@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends, status, Query
+
+from app.dependencies import require_role
+from app.db.base import UserRole
+from app.services.cycle_metrics import (
+    METRICS_SERIES_RETENTION_HOURS,
+    get_cycle_series,
+)
+from app.services.redis_clients import get_async_redis
+
+router = APIRouter(
+    prefix="/admin/metrics",
+    tags=["admin-metrics"],
+    dependencies=[Depends(require_role(UserRole.admin))]
+)
+
+
+@router.get("/price-updates", status_code=status.HTTP_200_OK)
+async def get_price_update_series(
+    hours: int = Query(
+        1,
+        ge=1,
+        le=METRICS_SERIES_RETENTION_HOURS,
+        description="Number of most recent hours to return"
+    )
+):
+    return {
+        "hours": hours,
+        "points": await get_cycle_series(get_async_redis(), hours),
+    }
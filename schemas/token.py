@@ -1,3 +1,5 @@
+from typing import NamedTuple
+
 from pydantic import BaseModel, Field
 
 
@@ -21,3 +23,21 @@ class TokenResponse(TokenBase):
 
 class TokenDelete(BaseModel):
     value: str
+
+
+class TokenRecord(NamedTuple):
+    id: int
+    chain: str
+    address: str
+    cex_symbol: str
+
+
+class TokenAsset(NamedTuple):
+    chain: str
+    address: str
+    cex_symbol: str
+    token_ids: tuple[int, ...]
+
+    @property
+    def key(self) -> str:
+        return f"{self.chain}:{self.address}:{self.cex_symbol}".lower()
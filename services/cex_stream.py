@@ -0,0 +1,316 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from typing import Awaitable, Callable, Iterable, Optional
+
+import redis
+import redis.asyncio as aioredis
+from websockets.asyncio.client import ClientConnection, connect
+from websockets.exceptions import WebSocketException
+
+from app.core.logger import logger
+from app.crud.token_sync import get_token_records
+from app.dependencies_sync import get_db
+from app.services.price_sources_sync import CEX_QUOTE_SUFFIX
+from app.services.redis_clients import close_async_redis, get_async_redis
+
+MEXC_WS_URL = os.getenv("MEXC_WS_URL", "wss://contract.mexc.com/edge")
+CEX_STREAM_ENABLED = os.getenv("CEX_STREAM", "false").lower() == "true"
+
+CEX_BOARD_KEY = "prices:cex:board"
+CEX_BOARD_MAX_AGE = float(os.getenv("CEX_BOARD_MAX_AGE", "30"))
+CEX_BOARD_FLUSH_INTERVAL = float(os.getenv("CEX_BOARD_FLUSH_INTERVAL", "1"))
+CEX_STREAM_PING_INTERVAL = float(os.getenv("CEX_STREAM_PING_INTERVAL", "20"))
+CEX_STREAM_RESYNC_INTERVAL = float(
+    os.getenv("CEX_STREAM_RESYNC_INTERVAL", "30")
+)
+CEX_STREAM_MAX_BACKOFF = float(os.getenv("CEX_STREAM_MAX_BACKOFF", "30"))
+
+SymbolLoader = Callable[[], Awaitable[Iterable[str]]]
+
+
+def _contract_symbol(symbol: str) -> str:
+    return f"{symbol.upper()}{CEX_QUOTE_SUFFIX}"
+
+
+def _base_symbol(contract_symbol: str) -> str:
+    return contract_symbol.upper().removesuffix(CEX_QUOTE_SUFFIX)
+
+
+class PriceBoard:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._prices: dict[str, tuple[float, float]] = {}
+        self._dirty: set[str] = set()
+        self._removed: set[str] = set()
+
+    def update(
+        self,
+        symbol: str,
+        price: float,
+        received_at: Optional[float] = None,
+    ) -> None:
+        received_at = time.time() if received_at is None else received_at
+        with self._lock:
+            self._prices[symbol] = (price, received_at)
+            self._dirty.add(symbol)
+            self._removed.discard(symbol)
+
+    def remove(self, symbols: Iterable[str]) -> None:
+        with self._lock:
+            for symbol in symbols:
+                self._prices.pop(symbol, None)
+                self._dirty.discard(symbol)
+                self._removed.add(symbol)
+
+    def get(
+        self,
+        symbol: str,
+        max_age: float = CEX_BOARD_MAX_AGE,
+    ) -> Optional[float]:
+        with self._lock:
+            item = self._prices.get(symbol.upper())
+        if item is None or time.time() - item[1] > max_age:
+            return None
+        return item[0]
+
+    def snapshot(self, max_age: float = CEX_BOARD_MAX_AGE) -> dict[str, float]:
+        now = time.time()
+        with self._lock:
+            return {
+                symbol: price
+                for symbol, (price, received_at) in self._prices.items()
+                if now - received_at <= max_age
+            }
+
+    async def publish(self, redis_client: aioredis.Redis) -> None:
+        with self._lock:
+            updates = {
+                symbol: "{}:{}".format(*self._prices[symbol])
+                for symbol in self._dirty
+            }
+            removed = list(self._removed)
+            self._dirty.clear()
+            self._removed.clear()
+
+        pipe = redis_client.pipeline(transaction=False)
+        if updates:
+            pipe.hset(CEX_BOARD_KEY, mapping=updates)
+        if removed:
+            pipe.hdel(CEX_BOARD_KEY, *removed)
+        pipe.expire(CEX_BOARD_KEY, int(CEX_BOARD_MAX_AGE * 10))
+        await pipe.execute()
+
+
+def _parse_board(
+    values: dict,
+    max_age: float,
+    now: Optional[float] = None,
+) -> dict[str, float]:
+    now = time.time() if now is None else now
+    prices = {}
+    for symbol, value in values.items():
+        if isinstance(symbol, bytes):
+            symbol = symbol.decode()
+        if isinstance(value, bytes):
+            value = value.decode()
+        price, received_at = map(float, value.split(":"))
+        if now - received_at <= max_age:
+            prices[symbol] = price
+    return prices
+
+
+def read_price_board(
+    redis_client: redis.Redis,
+    max_age: float = CEX_BOARD_MAX_AGE,
+) -> dict[str, float]:
+    return _parse_board(redis_client.hgetall(CEX_BOARD_KEY), max_age)
+
+
+async def read_price_board_async(
+    redis_client: aioredis.Redis,
+    max_age: float = CEX_BOARD_MAX_AGE,
+) -> dict[str, float]:
+    return _parse_board(await redis_client.hgetall(CEX_BOARD_KEY), max_age)
+
+
+async def load_tracked_symbols() -> set[str]:
+    def _load() -> set[str]:
+        with get_db() as db:
+            return {
+                record.cex_symbol.upper()
+                for record in get_token_records(db)
+                if record.cex_symbol
+            }
+
+    return await asyncio.to_thread(_load)
+
+
+class CexPriceStream:
+    def __init__(
+        self,
+        board: PriceBoard,
+        redis_client: Optional[aioredis.Redis] = None,
+        symbol_loader: SymbolLoader = load_tracked_symbols,
+        url: str = MEXC_WS_URL,
+        resync_interval: float = CEX_STREAM_RESYNC_INTERVAL,
+        ping_interval: float = CEX_STREAM_PING_INTERVAL,
+    ):
+        self.board = board
+        self.redis_client = redis_client
+        self.symbol_loader = symbol_loader
+        self.url = url
+        self.resync_interval = resync_interval
+        self.ping_interval = ping_interval
+        self.subscribed: set[str] = set()
+        self._stopped = asyncio.Event()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    async def run(self) -> None:
+        publisher = None
+        if self.redis_client is not None:
+            publisher = asyncio.create_task(self._publish_loop())
+
+        backoff = 1.0
+        try:
+            while not self._stopped.is_set():
+                try:
+                    async with connect(self.url, ping_interval=None) as ws:
+                        logger.info(f"CEX stream connected to {self.url}")
+                        backoff = 1.0
+                        await self._serve(ws)
+                except (OSError, WebSocketException) as e:
+                    logger.warning(f"CEX stream disconnected: {e!r}")
+
+                if self._stopped.is_set():
+                    break
+                try:
+                    await asyncio.wait_for(self._stopped.wait(), backoff)
+                except asyncio.TimeoutError:
+                    pass
+                backoff = min(backoff * 2, CEX_STREAM_MAX_BACKOFF)
+        finally:
+            if publisher is not None:
+                publisher.cancel()
+                await asyncio.gather(publisher, return_exceptions=True)
+                await self._publish()
+
+    async def _serve(self, ws: ClientConnection) -> None:
+        await self.resubscribe(ws, reconnect=True)
+
+        tasks = [
+            asyncio.create_task(self._read_loop(ws)),
+            asyncio.create_task(self._ping_loop(ws)),
+            asyncio.create_task(self._resync_loop(ws)),
+            asyncio.create_task(self._stopped.wait()),
+        ]
+        done, pending = await asyncio.wait(
+            tasks,
+            return_when=asyncio.FIRST_COMPLETED,
+        )
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        for task in done:
+            task.result()
+
+    async def resubscribe(
+        self,
+        ws: ClientConnection,
+        reconnect: bool = False,
+    ) -> None:
+        try:
+            symbols = {s.upper() for s in await self.symbol_loader()}
+        except Exception as e:
+            logger.error(f"CEX stream could not load symbols: {e!r}")
+            if not reconnect:
+                return
+            symbols = set(self.subscribed)
+
+        added = symbols if reconnect else symbols - self.subscribed
+        removed = self.subscribed - symbols
+        for symbol in sorted(added):
+            await ws.send(json.dumps({
+                "method": "sub.ticker",
+                "param": {"symbol": _contract_symbol(symbol)},
+            }))
+        if not reconnect:
+            for symbol in sorted(removed):
+                await ws.send(json.dumps({
+                    "method": "unsub.ticker",
+                    "param": {"symbol": _contract_symbol(symbol)},
+                }))
+
+        self.board.remove(removed)
+        self.subscribed = symbols
+        if added or removed:
+            logger.info(
+                f"CEX stream subscriptions: +{len(added)} -{len(removed)} "
+                f"({len(symbols)} total)"
+            )
+
+    def handle_message(self, raw) -> None:
+        try:
+            message = json.loads(raw)
+        except ValueError:
+            logger.debug(f"CEX stream sent a non-JSON frame: {raw!r}")
+            return
+
+        try:
+            if message.get("channel") != "push.ticker":
+                return
+
+            data = message.get("data") or {}
+            contract_symbol = data.get("symbol") or message.get("symbol")
+            price = data.get("indexPrice") or data.get("lastPrice")
+            if not contract_symbol or price is None:
+                return
+
+            symbol = _base_symbol(contract_symbol)
+            if symbol in self.subscribed:
+                self.board.update(symbol, float(price))
+        except (ValueError, TypeError, AttributeError) as e:
+            logger.warning(
+                f"CEX stream skipped a malformed frame {raw!r}: {e!r}"
+            )
+
+    async def _read_loop(self, ws: ClientConnection) -> None:
+        async for raw in ws:
+            self.handle_message(raw)
+
+    async def _ping_loop(self, ws: ClientConnection) -> None:
+        while True:
+            await asyncio.sleep(self.ping_interval)
+            await ws.send(json.dumps({"method": "ping"}))
+
+    async def _resync_loop(self, ws: ClientConnection) -> None:
+        while True:
+            await asyncio.sleep(self.resync_interval)
+            await self.resubscribe(ws)
+
+    async def _publish(self) -> None:
+        try:
+            await self.board.publish(self.redis_client)
+        except redis.RedisError as e:
+            logger.warning(f"CEX price board publish failed: {e}")
+
+    async def _publish_loop(self) -> None:
+        while True:
+            await asyncio.sleep(CEX_BOARD_FLUSH_INTERVAL)
+            await self._publish()
+
+
+async def main() -> None:
+    stream = CexPriceStream(PriceBoard(), redis_client=get_async_redis())
+    try:
+        await stream.run()
+    finally:
+        await close_async_redis()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,215 @@
+import os
+import weakref
+from typing import Optional
+from urllib.parse import urlparse
+
+import redis
+import redis.asyncio as aioredis
+
+from app.core.logger import logger
+from app.services.rate_limiter import RATE_LIMITS
+from app.services.redis_clients import get_async_redis, get_redis
+
+CIRCUIT_KEY = "circuit:{}"
+
+CIRCUIT_WINDOW = int(os.getenv("CIRCUIT_WINDOW", "30"))
+CIRCUIT_MIN_REQUESTS = int(os.getenv("CIRCUIT_MIN_REQUESTS", "10"))
+CIRCUIT_ERROR_RATE = float(os.getenv("CIRCUIT_ERROR_RATE", "0.5"))
+CIRCUIT_OPEN_SECONDS = int(os.getenv("CIRCUIT_OPEN_SECONDS", "30"))
+CIRCUIT_HALF_OPEN_PROBES = int(os.getenv("CIRCUIT_HALF_OPEN_PROBES", "3"))
+CIRCUIT_SLOW_CALL_SECONDS = float(os.getenv("CIRCUIT_SLOW_CALL_SECONDS", "5"))
+
+CIRCUIT_LUA = """
+if redis.replicate_commands then
+    redis.replicate_commands()
+end
+local key = KEYS[1]
+local op = ARGV[1]
+local window = tonumber(ARGV[2])
+local min_requests = tonumber(ARGV[3])
+local error_rate = tonumber(ARGV[4])
+local open_seconds = tonumber(ARGV[5])
+local probes = tonumber(ARGV[6])
+local now_raw = redis.call('TIME')
+local now = tonumber(now_raw[1]) + tonumber(now_raw[2]) / 1000000
+local state = redis.call('HGET', key, 'state') or 'closed'
+local ttl = math.max(window, open_seconds) * 4
+
+if op == 'allow' then
+    if state == 'closed' then
+        return 1
+    end
+    if state == 'open' then
+        local opened_at = tonumber(redis.call('HGET', key, 'opened_at'))
+        if now - opened_at < open_seconds then
+            return 0
+        end
+        state = 'half_open'
+        redis.call('HSET', key, 'state', state, 'probes', 0,
+                   'successes', 0, 'half_open_at', tostring(now))
+        redis.call('EXPIRE', key, ttl)
+    end
+    local half_open_at = tonumber(redis.call('HGET', key, 'half_open_at'))
+    if now - half_open_at >= open_seconds then
+        redis.call('HSET', key, 'probes', 0, 'successes', 0,
+                   'half_open_at', tostring(now))
+    end
+    if redis.call('HINCRBY', key, 'probes', 1) <= probes then
+        return 1
+    end
+    return 0
+end
+
+local failed = op == 'failure'
+
+if state == 'open' then
+    return 0
+end
+
+if state == 'half_open' then
+    if failed then
+        redis.call('HSET', key, 'state', 'open', 'opened_at', tostring(now))
+        redis.call('EXPIRE', key, ttl)
+    elseif redis.call('HINCRBY', key, 'successes', 1) >= probes then
+        redis.call('DEL', key)
+    end
+    return 0
+end
+
+local bucket = math.floor(now / window)
+if tonumber(redis.call('HGET', key, 'bucket')) ~= bucket then
+    redis.call('HSET', key, 'bucket', bucket, 'total', 0, 'failures', 0)
+end
+local total = redis.call('HINCRBY', key, 'total', 1)
+local failures = tonumber(redis.call('HGET', key, 'failures'))
+if failed then
+    failures = redis.call('HINCRBY', key, 'failures', 1)
+end
+if total >= min_requests and failures / total >= error_rate then
+    redis.call('HSET', key, 'state', 'open', 'opened_at', tostring(now))
+end
+redis.call('EXPIRE', key, ttl)
+return 0
+"""
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+def _args(op: str) -> list:
+    return [
+        op,
+        CIRCUIT_WINDOW,
+        CIRCUIT_MIN_REQUESTS,
+        CIRCUIT_ERROR_RATE,
+        CIRCUIT_OPEN_SECONDS,
+        CIRCUIT_HALF_OPEN_PROBES,
+    ]
+
+
+def _outcome(ok: bool, latency: float) -> str:
+    if ok and latency < CIRCUIT_SLOW_CALL_SECONDS:
+        return "success"
+    return "failure"
+
+
+class CircuitBreaker:
+    def __init__(self, redis_client: redis.Redis, host: str):
+        self.host = host
+        self.key = CIRCUIT_KEY.format(host)
+        self._script = redis_client.register_script(CIRCUIT_LUA)
+
+    def allow(self) -> bool:
+        return bool(self._script(keys=[self.key], args=_args("allow")))
+
+    def record(self, ok: bool, latency: float) -> None:
+        self._script(keys=[self.key], args=_args(_outcome(ok, latency)))
+
+
+class AsyncCircuitBreaker:
+    def __init__(self, redis_client: aioredis.Redis, host: str):
+        self.host = host
+        self.key = CIRCUIT_KEY.format(host)
+        self._script = redis_client.register_script(CIRCUIT_LUA)
+
+    async def allow(self) -> bool:
+        return bool(await self._script(keys=[self.key], args=_args("allow")))
+
+    async def record(self, ok: bool, latency: float) -> None:
+        await self._script(
+            keys=[self.key],
+            args=_args(_outcome(ok, latency)),
+        )
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+# Keyed by client, and so by event loop, like redis_clients.
+_async_breakers: "weakref.WeakKeyDictionary[aioredis.Redis, dict[str, AsyncCircuitBreaker]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _host_for(url: str) -> Optional[str]:
+    host = urlparse(url).netloc
+    return host if host in RATE_LIMITS else None
+
+
+def _get_breaker(host: str) -> CircuitBreaker:
+    if host not in _breakers:
+        _breakers[host] = CircuitBreaker(get_redis(), host)
+    return _breakers[host]
+
+
+def _get_async_breaker(host: str) -> AsyncCircuitBreaker:
+    redis_client = get_async_redis()
+    breakers = _async_breakers.setdefault(redis_client, {})
+    if host not in breakers:
+        breakers[host] = AsyncCircuitBreaker(redis_client, host)
+    return breakers[host]
+
+
+def check_circuit(url: str) -> None:
+    host = _host_for(url)
+    if host is None:
+        return
+    try:
+        allowed = _get_breaker(host).allow()
+    except redis.RedisError as e:
+        logger.warning(f"Circuit breaker unavailable for {host}: {e}")
+        return
+    if not allowed:
+        raise CircuitOpenError(f"Circuit open for {host}")
+
+
+def record_call(url: str, ok: bool, latency: float) -> None:
+    host = _host_for(url)
+    if host is None:
+        return
+    try:
+        _get_breaker(host).record(ok, latency)
+    except redis.RedisError as e:
+        logger.debug(f"Circuit breaker record failed for {host}: {e}")
+
+
+async def check_circuit_async(url: str) -> None:
+    host = _host_for(url)
+    if host is None:
+        return
+    try:
+        allowed = await _get_async_breaker(host).allow()
+    except redis.RedisError as e:
+        logger.warning(f"Circuit breaker unavailable for {host}: {e}")
+        return
+    if not allowed:
+        raise CircuitOpenError(f"Circuit open for {host}")
+
+
+async def record_call_async(url: str, ok: bool, latency: float) -> None:
+    host = _host_for(url)
+    if host is None:
+        return
+    try:
+        await _get_async_breaker(host).record(ok, latency)
+    except redis.RedisError as e:
+        logger.debug(f"Circuit breaker record failed for {host}: {e}")
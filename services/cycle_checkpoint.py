@@ -0,0 +1,89 @@
+import os
+import uuid
+from typing import Iterable, Optional, Sequence
+
+import redis
+
+from app.core.logger import logger
+from app.schemas.token import TokenAsset
+
+CHECKPOINT_KEY = "prices:checkpoint"
+CHECKPOINT_TTL = int(os.getenv("PRICE_CHECKPOINT_TTL", "120"))
+
+
+class CycleCheckpoint:
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        key: str = CHECKPOINT_KEY,
+        ttl: int = CHECKPOINT_TTL,
+    ):
+        self.redis_client = redis_client
+        self.cycle_key = f"{key}:cycle"
+        self.done_key = f"{key}:done"
+        self.ttl = ttl
+        self.cycle_id: Optional[str] = None
+        self.completed: set[int] = set()
+
+    @property
+    def resumed(self) -> bool:
+        return bool(self.completed)
+
+    def begin(self) -> str:
+        try:
+            cycle_id = self.redis_client.get(self.cycle_key)
+            if cycle_id:
+                self.cycle_id = (
+                    cycle_id.decode() if isinstance(cycle_id, bytes)
+                    else cycle_id
+                )
+                self.completed = {
+                    int(token_id)
+                    for token_id in self.redis_client.smembers(self.done_key)
+                }
+                return self.cycle_id
+
+            self.cycle_id = uuid.uuid4().hex
+            pipe = self.redis_client.pipeline()
+            pipe.delete(self.done_key)
+            pipe.set(self.cycle_key, self.cycle_id, ex=self.ttl)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Cycle checkpoint unavailable: {e}")
+            self.cycle_id = self.cycle_id or uuid.uuid4().hex
+        return self.cycle_id
+
+    def pending(self, assets: Sequence[TokenAsset]) -> list[TokenAsset]:
+        if not self.completed:
+            return list(assets)
+
+        remaining = []
+        for asset in assets:
+            token_ids = tuple(
+                token_id for token_id in asset.token_ids
+                if token_id not in self.completed
+            )
+            if token_ids:
+                remaining.append(asset._replace(token_ids=token_ids))
+        return remaining
+
+    def mark(self, token_ids: Iterable[int]) -> None:
+        token_ids = list(token_ids)
+        if not token_ids:
+            return
+
+        self.completed.update(token_ids)
+        try:
+            pipe = self.redis_client.pipeline()
+            pipe.sadd(self.done_key, *token_ids)
+            pipe.expire(self.done_key, self.ttl)
+            pipe.expire(self.cycle_key, self.ttl)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Cycle checkpoint update failed: {e}")
+
+    def finish(self) -> None:
+        try:
+            self.redis_client.delete(self.cycle_key, self.done_key)
+        except redis.RedisError as e:
+            logger.warning(f"Cycle checkpoint cleanup failed: {e}")
@@ -0,0 +1,88 @@
+import os
+import time
+from typing import Optional, Sequence
+
+import redis
+
+from app.core.logger import logger
+from app.schemas.token import TokenAsset
+
+CARRYOVER_KEY = "prices:carryover"
+
+CYCLE_DEADLINE = float(os.getenv("PRICE_CYCLE_DEADLINE", "8"))
+CYCLE_STORE_RESERVE = float(os.getenv("PRICE_CYCLE_STORE_RESERVE", "1"))
+CYCLE_PREFETCH_SHARE = float(os.getenv("PRICE_CYCLE_PREFETCH_SHARE", "0.5"))
+CARRYOVER_TTL = int(os.getenv("PRICE_CARRYOVER_TTL", "300"))
+
+
+class CycleDeadline:
+    def __init__(
+        self,
+        seconds: Optional[float] = CYCLE_DEADLINE,
+        reserve: float = CYCLE_STORE_RESERVE,
+    ):
+        self.seconds = seconds if seconds and seconds > 0 else None
+        self.reserve = reserve
+        self.started = time.monotonic()
+
+    @property
+    def dispatch_until(self) -> Optional[float]:
+        if self.seconds is None:
+            return None
+        return self.started + max(self.seconds - self.reserve, 0.0)
+
+    def prefetch_until(
+        self,
+        share: float = CYCLE_PREFETCH_SHARE,
+    ) -> Optional[float]:
+        # Bulk prefetches get part of what is left, so the per-asset
+        # lookups that follow still have time to run.
+        if self.seconds is None:
+            return None
+        return time.monotonic() + self.remaining() * share
+
+    def remaining(self) -> float:
+        if self.seconds is None:
+            return float("inf")
+        return max(self.dispatch_until - time.monotonic(), 0.0)
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def request_timeout(self, cap: float) -> float:
+        return min(cap, self.remaining())
+
+
+class CarryOver:
+    def __init__(self, redis_client: redis.Redis, key: str = CARRYOVER_KEY):
+        self.redis_client = redis_client
+        self.key = key
+
+    def prioritize(self, assets: Sequence[TokenAsset]) -> list[TokenAsset]:
+        try:
+            carried = self.redis_client.smembers(self.key)
+        except redis.RedisError as e:
+            logger.warning(f"Carry-over list unavailable: {e}")
+            return list(assets)
+
+        if not carried:
+            return list(assets)
+
+        carried = {
+            key.decode() if isinstance(key, bytes) else key
+            for key in carried
+        }
+        first = [asset for asset in assets if asset.key in carried]
+        rest = [asset for asset in assets if asset.key not in carried]
+        return first + rest
+
+    def save(self, assets: Sequence[TokenAsset]) -> None:
+        try:
+            pipe = self.redis_client.pipeline()
+            pipe.delete(self.key)
+            if assets:
+                pipe.sadd(self.key, *(asset.key for asset in assets))
+                pipe.expire(self.key, CARRYOVER_TTL)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Carry-over list update failed: {e}")
@@ -0,0 +1,97 @@
+import os
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+import redis
+import redis.asyncio as aioredis
+
+METRICS_SERIES_KEY = "metrics:series:{}"
+METRICS_SERIES_RETENTION_HOURS = int(
+    os.getenv("METRICS_SERIES_RETENTION_HOURS", "48")
+)
+SERIES_COUNTERS = ("total", "success", "warning", "error", "skipped", "deferred")
+
+
+def _minute(timestamp: float) -> int:
+    return int(timestamp // 60 * 60)
+
+
+def add_cycle_to_series(
+    pipe: redis.client.Pipeline,
+    stats: dict,
+    now: Optional[float] = None,
+) -> None:
+    now = time.time() if now is None else now
+    key = METRICS_SERIES_KEY.format(_minute(now))
+
+    pipe.hincrby(key, "cycles", 1)
+    for field in SERIES_COUNTERS:
+        pipe.hincrby(key, field, stats.get(field, 0))
+    pipe.hincrby(
+        key,
+        "duration_ms",
+        int(stats.get("duration_seconds", 0) * 1000),
+    )
+    for source, data in (stats.get("sources") or {}).items():
+        pipe.hincrby(key, f"{source}:requests", data["requests"])
+        pipe.hincrby(key, f"{source}:errors", data["errors"])
+        pipe.hincrby(
+            key,
+            f"{source}:latency_ms",
+            int(data["latency"]["sum_ms"]),
+        )
+    pipe.expire(key, METRICS_SERIES_RETENTION_HOURS * 3600)
+
+
+def _decode(value) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def _point(minute: int, bucket: dict) -> dict:
+    values = {_decode(k): int(v) for k, v in bucket.items()}
+    cycles = values.pop("cycles", 0)
+    duration_ms = values.pop("duration_ms", 0)
+    point = {
+        "timestamp": datetime.fromtimestamp(minute, timezone.utc).isoformat(),
+        "cycles": cycles,
+        "avg_duration_seconds": (
+            round(duration_ms / cycles / 1000, 3) if cycles else None
+        ),
+    }
+    for field in SERIES_COUNTERS:
+        point[field] = values.pop(field, 0)
+
+    sources: dict[str, dict] = {}
+    for field, value in values.items():
+        source, _, name = field.partition(":")
+        sources.setdefault(source, {})[name] = value
+    for data in sources.values():
+        requests = data.get("requests", 0)
+        data["avg_latency_ms"] = (
+            round(data.pop("latency_ms", 0) / requests, 2)
+            if requests else None
+        )
+    point["sources"] = sources
+    return point
+
+
+async def get_cycle_series(
+    redis_client: aioredis.Redis,
+    hours: int,
+    now: Optional[float] = None,
+) -> list[dict]:
+    now = time.time() if now is None else now
+    last = _minute(now)
+    minutes = list(range(last - hours * 3600 + 60, last + 60, 60))
+
+    pipe = redis_client.pipeline(transaction=False)
+    for minute in minutes:
+        pipe.hgetall(METRICS_SERIES_KEY.format(minute))
+    buckets = await pipe.execute()
+
+    return [
+        _point(minute, bucket)
+        for minute, bucket in zip(minutes, buckets)
+        if bucket
+    ]
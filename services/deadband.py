@@ -0,0 +1,95 @@
+import os
+import time
+from typing import Optional, Sequence
+
+import redis
+
+from app.core.logger import logger
+
+DEADBAND_KEY = "prices:deadband:last"
+
+DEADBAND_ENABLED = os.getenv("PRICE_DEADBAND", "true").lower() == "true"
+DEADBAND_PCT = float(os.getenv("PRICE_DEADBAND_PCT", "0.05"))
+DEADBAND_HEARTBEAT = float(os.getenv("PRICE_DEADBAND_HEARTBEAT", "300"))
+
+
+def _relative_change_pct(value: float, previous: float) -> float:
+    if previous <= 0:
+        return float("inf")
+    return abs(value - previous) / previous * 100
+
+
+class PriceDeadband:
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        threshold_pct: float = DEADBAND_PCT,
+        heartbeat: float = DEADBAND_HEARTBEAT,
+    ):
+        self.redis_client = redis_client
+        self.threshold_pct = threshold_pct
+        self.heartbeat = heartbeat
+
+    def filter(
+        self,
+        rows: Sequence[dict],
+        now: Optional[float] = None,
+    ) -> list[dict]:
+        if not rows:
+            return []
+
+        now = time.time() if now is None else now
+        try:
+            cached = self.redis_client.hmget(
+                DEADBAND_KEY,
+                [row["token_id"] for row in rows],
+            )
+        except redis.RedisError as e:
+            logger.warning(f"Deadband cache unavailable: {e}")
+            return list(rows)
+
+        changed = []
+        for row, last in zip(rows, cached):
+            if last is None:
+                changed.append(row)
+                continue
+
+            if isinstance(last, bytes):
+                last = last.decode()
+            price_dex, price_cex, written_at = map(float, last.split(":"))
+            change_pct = max(
+                _relative_change_pct(row["price_dex"], price_dex),
+                _relative_change_pct(row["price_cex"], price_cex),
+            )
+            if (
+                change_pct > self.threshold_pct
+                or now - written_at >= self.heartbeat
+            ):
+                changed.append(row)
+
+        return changed
+
+    def record(
+        self,
+        rows: Sequence[dict],
+        now: Optional[float] = None,
+    ) -> None:
+        if not rows:
+            return
+
+        now = time.time() if now is None else now
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.hset(
+                DEADBAND_KEY,
+                mapping={
+                    row["token_id"]: (
+                        f"{row['price_dex']}:{row['price_cex']}:{now}"
+                    )
+                    for row in rows
+                },
+            )
+            pipe.expire(DEADBAND_KEY, int(self.heartbeat * 10))
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Deadband cache update failed: {e}")
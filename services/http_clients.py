@@ -0,0 +1,66 @@
+import asyncio
+import os
+import threading
+import weakref
+from typing import Optional
+
+import aiohttp
+import requests
+
+from app.services.price_sources_sync import create_http_session
+
+HTTP_POOL_MAXSIZE = int(os.getenv(
+    "HTTP_POOL_MAXSIZE",
+    str(
+        int(os.getenv("MAX_CONCURRENT_REQUESTS", "5"))
+        + int(os.getenv("SOURCE_FETCH_WORKERS", "20"))
+    ),
+))
+ASYNC_HTTP_LIMIT = int(os.getenv("ASYNC_MAX_CONCURRENCY", "200"))
+HTTP_KEEPALIVE_TIMEOUT = float(os.getenv("HTTP_KEEPALIVE_TIMEOUT", "60"))
+
+_lock = threading.Lock()
+_http_session: Optional[requests.Session] = None
+_async_sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_http_session() -> requests.Session:
+    global _http_session
+    with _lock:
+        if _http_session is None:
+            _http_session = create_http_session(pool_maxsize=HTTP_POOL_MAXSIZE)
+        return _http_session
+
+
+def close_http_session() -> None:
+    global _http_session
+    with _lock:
+        if _http_session is not None:
+            _http_session.close()
+            _http_session = None
+
+
+def get_async_http_session() -> aiohttp.ClientSession:
+    loop = asyncio.get_running_loop()
+    session = _async_sessions.get(loop)
+    if session is None or session.closed:
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=ASYNC_HTTP_LIMIT,
+                keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+            ),
+            headers={
+                "User-Agent": "CryptoPriceTracker/1.0",
+                "Accept": "application/json",
+            },
+        )
+        _async_sessions[loop] = session
+    return session
+
+
+async def close_async_http_session() -> None:
+    session = _async_sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None:
+        await session.close()
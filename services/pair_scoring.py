@@ -0,0 +1,54 @@
+from typing import Optional, Sequence, Tuple
+
+W_LIQUIDITY = 0.7
+W_VOLUME = 0.3
+PREFERRED_QUOTE_BOOST = 1.2
+
+
+def select_best_pair(
+    pairs: Sequence[dict],
+    preferred_quote: Tuple[str, ...] = ("USDC", "USDT"),
+    min_liquidity: float = 10000,
+    min_volume: float = 5000,
+) -> Optional[dict]:
+    best_index = -1
+    best_score = 0.0
+    best_liquidity = best_volume = 0.0
+
+    for index, pair in enumerate(pairs):
+        liquidity = float((pair.get("liquidity") or {}).get("usd") or 0)
+        if liquidity < min_liquidity:
+            continue
+        volume = float((pair.get("volume") or {}).get("h24") or 0)
+        if volume < min_volume:
+            continue
+
+        score = liquidity * W_LIQUIDITY + volume * W_VOLUME
+        if score * PREFERRED_QUOTE_BOOST <= best_score:
+            continue
+
+        quote_symbol = (pair.get("quoteToken") or {}).get("symbol", "")
+        if quote_symbol in preferred_quote:
+            score *= PREFERRED_QUOTE_BOOST
+
+        if score > best_score:
+            best_index = index
+            best_score = score
+            best_liquidity = liquidity
+            best_volume = volume
+
+    if best_index < 0:
+        return None
+
+    pair = pairs[best_index]
+    return {
+        "chainId": pair.get("chainId"),
+        "dexId": pair.get("dexId"),
+        "pairAddress": pair.get("pairAddress"),
+        "base": (pair.get("baseToken") or {}).get("symbol"),
+        "quote": (pair.get("quoteToken") or {}).get("symbol", ""),
+        "liquidity_usd": best_liquidity,
+        "volume_24h": best_volume,
+        "price_usd": pair.get("priceUsd"),
+        "score": round(best_score, 2),
+    }
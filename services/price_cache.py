@@ -0,0 +1,288 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+import redis
+
+from app.core.logger import logger
+from app.services.redis_clients import get_async_redis, get_redis
+
+PRICE_CACHE_KEY = "pricecache:{}:{}"
+PRICE_CACHE_TTL = float(os.getenv("PRICE_CACHE_TTL", "5"))
+PRICE_CACHE_MISS_TTL = float(os.getenv("PRICE_CACHE_MISS_TTL", "60"))
+LOCAL_CACHE_SIZE = int(os.getenv("PRICE_CACHE_LOCAL_SIZE", "4096"))
+
+DEX = "dex"
+CEX = "cex"
+
+# Stored for keys the source answered without a price (an unlisted symbol,
+# an address with no usable pair); lookups return them as a cached None.
+MISSING = "-"
+_ABSENT = object()
+
+
+def _normalize(source: str, key: str) -> str:
+    return key.upper() if source == CEX else key.lower()
+
+
+class LocalPriceCache:
+    def __init__(self, maxsize: int = LOCAL_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._items: OrderedDict[str, tuple[Optional[float], float]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default=None) -> Optional[float]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return default
+            price, expires_at = item
+            if expires_at <= time.monotonic():
+                del self._items[key]
+                return default
+            self._items.move_to_end(key)
+            return price
+
+    def set(self, key: str, price: Optional[float], ttl: float) -> None:
+        with self._lock:
+            self._items[key] = (price, time.monotonic() + ttl)
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+
+class CacheStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    def record(self, local_hits=0, redis_hits=0, misses=0) -> None:
+        with self._lock:
+            self.local_hits += local_hits
+            self.redis_hits += redis_hits
+            self.misses += misses
+
+    def reset(self) -> None:
+        with self._lock:
+            self.local_hits = 0
+            self.redis_hits = 0
+            self.misses = 0
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            lookups = self.local_hits + self.redis_hits + self.misses
+            hits = self.local_hits + self.redis_hits
+            return {
+                "local_hits": self.local_hits,
+                "redis_hits": self.redis_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+local_cache = LocalPriceCache()
+cache_stats = CacheStats()
+
+
+def _split_local(
+    source: str,
+    keys: Iterable[str],
+) -> tuple[dict[str, Optional[float]], list[str]]:
+    found: dict[str, Optional[float]] = {}
+    missing: list[str] = []
+    for key in keys:
+        price = local_cache.get(
+            PRICE_CACHE_KEY.format(source, _normalize(source, key)),
+            _ABSENT,
+        )
+        if price is _ABSENT:
+            missing.append(key)
+        else:
+            found[key] = price
+    return found, missing
+
+
+def _merge_remote(
+    source: str,
+    keys: list[str],
+    values: list,
+    found: dict[str, Optional[float]],
+) -> None:
+    for key, value in zip(keys, values):
+        if value is None:
+            continue
+        if isinstance(value, bytes):
+            value = value.decode()
+        price = None if value == MISSING else float(value)
+        found[key] = price
+        local_cache.set(
+            PRICE_CACHE_KEY.format(source, _normalize(source, key)),
+            price,
+            PRICE_CACHE_TTL,
+        )
+
+
+def _missing_entries(source: str, keys: Iterable[str]) -> dict[str, str]:
+    return {
+        PRICE_CACHE_KEY.format(source, _normalize(source, key)): MISSING
+        for key in keys
+    }
+
+
+def get_cached_prices(
+    source: str,
+    keys: Iterable[str],
+) -> dict[str, Optional[float]]:
+    found, missing = _split_local(source, keys)
+    local_hits = len(found)
+
+    if missing:
+        try:
+            values = get_redis().mget([
+                PRICE_CACHE_KEY.format(source, _normalize(source, key))
+                for key in missing
+            ])
+            _merge_remote(source, missing, values, found)
+        except redis.RedisError as e:
+            logger.debug(f"Price cache read failed: {e}")
+
+    cache_stats.record(
+        local_hits=local_hits,
+        redis_hits=len(found) - local_hits,
+        misses=len(missing) - (len(found) - local_hits),
+    )
+    return found
+
+
+def get_cached_price(source: str, key: str) -> Optional[float]:
+    return get_cached_prices(source, [key]).get(key)
+
+
+def set_cached_prices(source: str, prices: dict[str, Optional[float]]) -> None:
+    entries = {
+        PRICE_CACHE_KEY.format(source, _normalize(source, key)): float(price)
+        for key, price in prices.items()
+        if price is not None
+    }
+    if not entries:
+        return
+
+    for cache_key, price in entries.items():
+        local_cache.set(cache_key, price, PRICE_CACHE_TTL)
+
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        for cache_key, price in entries.items():
+            pipe.set(cache_key, price, px=int(PRICE_CACHE_TTL * 1000))
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.debug(f"Price cache write failed: {e}")
+
+
+def set_cached_price(source: str, key: str, price: Optional[float]) -> None:
+    set_cached_prices(source, {key: price})
+
+
+def set_missing_prices(source: str, keys: Iterable[str]) -> None:
+    entries = _missing_entries(source, keys)
+    if not entries:
+        return
+
+    for cache_key in entries:
+        local_cache.set(cache_key, None, PRICE_CACHE_TTL)
+
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        for cache_key, value in entries.items():
+            pipe.set(cache_key, value, px=int(PRICE_CACHE_MISS_TTL * 1000))
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.debug(f"Price cache write failed: {e}")
+
+
+async def get_cached_prices_async(
+    source: str,
+    keys: Iterable[str],
+) -> dict[str, Optional[float]]:
+    found, missing = _split_local(source, keys)
+    local_hits = len(found)
+
+    if missing:
+        try:
+            values = await get_async_redis().mget([
+                PRICE_CACHE_KEY.format(source, _normalize(source, key))
+                for key in missing
+            ])
+            _merge_remote(source, missing, values, found)
+        except redis.RedisError as e:
+            logger.debug(f"Price cache read failed: {e}")
+
+    cache_stats.record(
+        local_hits=local_hits,
+        redis_hits=len(found) - local_hits,
+        misses=len(missing) - (len(found) - local_hits),
+    )
+    return found
+
+
+async def get_cached_price_async(source: str, key: str) -> Optional[float]:
+    return (await get_cached_prices_async(source, [key])).get(key)
+
+
+async def set_cached_prices_async(
+    source: str,
+    prices: dict[str, Optional[float]],
+) -> None:
+    entries = {
+        PRICE_CACHE_KEY.format(source, _normalize(source, key)): float(price)
+        for key, price in prices.items()
+        if price is not None
+    }
+    if not entries:
+        return
+
+    for cache_key, price in entries.items():
+        local_cache.set(cache_key, price, PRICE_CACHE_TTL)
+
+    try:
+        pipe = get_async_redis().pipeline(transaction=False)
+        for cache_key, price in entries.items():
+            pipe.set(cache_key, price, px=int(PRICE_CACHE_TTL * 1000))
+        await pipe.execute()
+    except redis.RedisError as e:
+        logger.debug(f"Price cache write failed: {e}")
+
+
+async def set_cached_price_async(
+    source: str,
+    key: str,
+    price: Optional[float],
+) -> None:
+    await set_cached_prices_async(source, {key: price})
+
+
+async def set_missing_prices_async(source: str, keys: Iterable[str]) -> None:
+    entries = _missing_entries(source, keys)
+    if not entries:
+        return
+
+    for cache_key in entries:
+        local_cache.set(cache_key, None, PRICE_CACHE_TTL)
+
+    try:
+        pipe = get_async_redis().pipeline(transaction=False)
+        for cache_key, value in entries.items():
+            pipe.set(cache_key, value, px=int(PRICE_CACHE_MISS_TTL * 1000))
+        await pipe.execute()
+    except redis.RedisError as e:
+        logger.debug(f"Price cache write failed: {e}")
@@ -0,0 +1,235 @@
+import os
+import re
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.core.logger import logger
+
+PRICES_TABLE = "prices"
+DETACHED_PREFIX = f"{PRICES_TABLE}_detached_"
+DAY = "day"
+WEEK = "week"
+
+PARTITION_INTERVAL = os.getenv("PRICE_PARTITION_INTERVAL", DAY).lower()
+PARTITION_PREMAKE = int(os.getenv("PRICE_PARTITION_PREMAKE", "7"))
+
+DETACH = "detach"
+DROP = "drop"
+
+# History is kept unless retention is configured. Expired partitions,
+# prices_legacy included once all of it is past retention, are detached and
+# renamed prices_detached_<upper bound>; they are dropped after the grace
+# period (0 keeps them for manual cleanup), or at once with
+# PRICE_PARTITION_RETENTION=drop.
+PRICE_RETENTION_DAYS = int(os.getenv("PRICE_RETENTION_DAYS", "0"))
+PARTITION_RETENTION_MODE = os.getenv(
+    "PRICE_PARTITION_RETENTION", DETACH
+).lower()
+DETACHED_GRACE_DAYS = int(os.getenv("PRICE_PARTITION_DETACH_GRACE_DAYS", "7"))
+
+_BOUND_RE = re.compile(r"FROM \((.+?)\) TO \((.+?)\)")
+
+
+class Partition(NamedTuple):
+    name: str
+    lower: Optional[datetime]
+    upper: Optional[datetime]
+
+    def overlaps(self, start: datetime, end: datetime) -> bool:
+        return (
+            (self.lower is None or self.lower < end)
+            and (self.upper is None or start < self.upper)
+        )
+
+
+def _parse_bound(value: str) -> Optional[datetime]:
+    if value in ("MINVALUE", "MAXVALUE"):
+        return None
+    return datetime.fromisoformat(value.strip("'")).astimezone(timezone.utc)
+
+
+def period_start(moment: datetime, interval: str = PARTITION_INTERVAL) -> datetime:
+    moment = moment.astimezone(timezone.utc)
+    start = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    if interval == WEEK:
+        start -= timedelta(days=start.weekday())
+    return start
+
+
+def next_period(start: datetime, interval: str = PARTITION_INTERVAL) -> datetime:
+    return start + timedelta(days=7 if interval == WEEK else 1)
+
+
+def partition_name(start: datetime) -> str:
+    return f"{PRICES_TABLE}_p{start:%Y%m%d}"
+
+
+def detached_name(upper: datetime) -> str:
+    return f"{DETACHED_PREFIX}{upper:%Y%m%d}"
+
+
+def list_partitions(conn: Connection) -> list[Partition]:
+    rows = conn.execute(text(
+        "SELECT child.relname, pg_get_expr(child.relpartbound, child.oid) "
+        "FROM pg_inherits "
+        "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE parent.relname = :table "
+        "ORDER BY child.relname"
+    ), {"table": PRICES_TABLE})
+
+    partitions = []
+    for name, bound in rows:
+        match = _BOUND_RE.search(bound or "")
+        if match is None:
+            continue
+        partitions.append(Partition(
+            name,
+            _parse_bound(match.group(1)),
+            _parse_bound(match.group(2)),
+        ))
+    return partitions
+
+
+def create_partition(
+    conn: Connection,
+    start: datetime,
+    end: datetime,
+    name: Optional[str] = None,
+) -> str:
+    name = name or partition_name(start)
+    conn.execute(text(
+        f'CREATE TABLE IF NOT EXISTS "{name}" '
+        f'PARTITION OF {PRICES_TABLE} '
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    ))
+    return name
+
+
+def create_partitions(
+    conn: Connection,
+    start: datetime,
+    end: datetime,
+    interval: str = PARTITION_INTERVAL,
+) -> list[str]:
+    existing = list_partitions(conn)
+
+    created = []
+    start = period_start(start, interval)
+    while start < end:
+        period_end = next_period(period_start(start, interval), interval)
+        covering = [
+            partition for partition in existing
+            if partition.overlaps(start, period_end)
+        ]
+        if not covering:
+            created.append(create_partition(conn, start, period_end))
+            start = period_end
+            continue
+        # Fill the gap up to the first overlapping partition, then skip it.
+        first = min(
+            covering,
+            key=lambda partition: partition.lower or datetime.min.replace(
+                tzinfo=timezone.utc
+            ),
+        )
+        if first.lower is not None and first.lower > start:
+            created.append(create_partition(conn, start, first.lower))
+        if first.upper is None:
+            break
+        start = max(start, first.upper)
+    return created
+
+
+def create_partitions_ahead(
+    conn: Connection,
+    now: Optional[datetime] = None,
+    premake: int = PARTITION_PREMAKE,
+    interval: str = PARTITION_INTERVAL,
+) -> list[str]:
+    now = datetime.now(timezone.utc) if now is None else now
+    start = period_start(now, interval)
+    horizon = next_period(start, interval)
+    for _ in range(premake):
+        horizon = next_period(horizon, interval)
+    return create_partitions(conn, start, horizon, interval)
+
+
+def expire_partitions(
+    conn: Connection,
+    now: Optional[datetime] = None,
+    retention_days: int = PRICE_RETENTION_DAYS,
+    mode: str = PARTITION_RETENTION_MODE,
+) -> list[str]:
+    if retention_days <= 0:
+        return []
+
+    now = datetime.now(timezone.utc) if now is None else now
+    cutoff = now - timedelta(days=retention_days)
+
+    expired = []
+    for partition in list_partitions(conn):
+        if partition.upper is None or partition.upper > cutoff:
+            continue
+        conn.execute(text(
+            f'ALTER TABLE {PRICES_TABLE} DETACH PARTITION "{partition.name}"'
+        ))
+        if mode == DROP:
+            conn.execute(text(f'DROP TABLE "{partition.name}"'))
+        else:
+            conn.execute(text(
+                f'ALTER TABLE "{partition.name}" '
+                f'RENAME TO "{detached_name(partition.upper)}"'
+            ))
+        expired.append(partition.name)
+    return expired
+
+
+def drop_detached_partitions(
+    conn: Connection,
+    now: Optional[datetime] = None,
+    retention_days: int = PRICE_RETENTION_DAYS,
+    grace_days: int = DETACHED_GRACE_DAYS,
+) -> list[str]:
+    if retention_days <= 0 or grace_days <= 0:
+        return []
+
+    now = datetime.now(timezone.utc) if now is None else now
+    cutoff = now - timedelta(days=retention_days + grace_days)
+    rows = conn.execute(text(
+        "SELECT relname FROM pg_class "
+        "WHERE relkind = 'r' AND NOT relispartition "
+        "AND starts_with(relname, :prefix) "
+        "ORDER BY relname"
+    ), {"prefix": DETACHED_PREFIX})
+
+    dropped = []
+    for (name,) in rows:
+        try:
+            upper = datetime.strptime(name[len(DETACHED_PREFIX):], "%Y%m%d")
+        except ValueError:
+            continue
+        if upper.replace(tzinfo=timezone.utc) > cutoff:
+            continue
+        conn.execute(text(f'DROP TABLE "{name}"'))
+        dropped.append(name)
+    return dropped
+
+
+def maintain_partitions(
+    conn: Connection,
+    now: Optional[datetime] = None,
+) -> dict:
+    created = create_partitions_ahead(conn, now)
+    expired = expire_partitions(conn, now)
+    dropped = drop_detached_partitions(conn, now)
+    if created or expired or dropped:
+        logger.info(
+            f"Price partitions: created {created}, "
+            f"expired ({PARTITION_RETENTION_MODE}) {expired}, "
+            f"dropped detached {dropped}"
+        )
+    return {"created": created, "expired": expired, "dropped": dropped}
@@ -1,13 +1,85 @@
+import asyncio
+import json
+import time
+
 import aiohttp
 
-DEXSCREENER_TOKEN_URL = "https://api.dexscreener.com/latest/dex/tokens/{}"
-CEX_MEXC_TOKEN_URL = 'https://contract.mexc.com/api/v1/contract/index_price/{}_USDT'
+from app.core.logger import logger
+from app.services.circuit_breaker import (
+    check_circuit_async,
+    record_call_async,
+)
+from app.services.pair_scoring import select_best_pair
+from app.services.price_cache import (
+    CEX,
+    DEX,
+    get_cached_prices_async,
+    set_cached_price_async,
+    set_cached_prices_async,
+    set_missing_prices_async,
+)
+from app.services.rate_limiter import (
+    CEX_BASE_URL,
+    DEX_BASE_URL,
+    DEX_HOST,
+    RATE_LIMITS,
+    acquire_async as acquire_rate_limit,
+)
+from app.services.source_metrics import source_metrics
 
-W_LIQUIDITY = 0.7
-W_VOLUME = 0.3
+DEXSCREENER_TOKEN_URL = DEX_BASE_URL + "/latest/dex/tokens/{}"
+DEXSCREENER_MAX_BATCH = 30
+CEX_MEXC_TOKEN_URL = CEX_BASE_URL + "/api/v1/contract/index_price/{}_USDT"
+CEX_MEXC_TICKER_URL = CEX_BASE_URL + "/api/v1/contract/ticker"
+CEX_QUOTE_SUFFIX = "_USDT"
+DEX_TIMEOUT = 10
 
 
-async def get_dex_price(
+async def fetch_json(
+    session,
+    url: str,
+    timeout: float,
+    source: str,
+    rate_limited: bool = True,
+):
+    await check_circuit_async(url)
+    if rate_limited:
+        await acquire_rate_limit(url, max_wait=timeout)
+
+    started = time.monotonic()
+    try:
+        async with session.get(
+            url, timeout=aiohttp.ClientTimeout(total=timeout)
+        ) as resp:
+            status = resp.status
+            body = await resp.read()
+    except asyncio.CancelledError:
+        # A surrounding wait_for timing out cancels the request; count it
+        # as a failure so timeouts can open the circuit.
+        latency = time.monotonic() - started
+        source_metrics.observe(source, latency, timeout=True)
+        await record_call_async(url, False, latency)
+        raise
+    except Exception as e:
+        latency = time.monotonic() - started
+        await record_call_async(url, False, latency)
+        source_metrics.observe(
+            source, latency,
+            error=True, timeout=isinstance(e, asyncio.TimeoutError),
+        )
+        raise
+
+    latency = time.monotonic() - started
+    await record_call_async(url, status < 500 and status != 429, latency)
+    source_metrics.observe(
+        source, latency,
+        bytes_received=len(body), error=status >= 400,
+    )
+    data = json.loads(body) if 200 <= status < 300 else None
+    return status, data
+
+
+async def _fetch_dex_price(
     session,
     token_address: str,
     preferred_quote=("USDC", "USDT"),
@@ -16,53 +88,182 @@ async def get_dex_price(
 ):
     url = DEXSCREENER_TOKEN_URL.format(token_address)
 
-    async with session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as resp:
-        if resp.status != 200:
-            raise RuntimeError(f"Dexscreener error {resp.status}")
-        data = await resp.json()
+    status, data = await fetch_json(session, url, DEX_TIMEOUT, DEX)
+    if status != 200:
+        raise RuntimeError(f"Dexscreener error {status}")
 
     pairs = data.get("pairs", [])
     if not pairs:
         return None
 
-    best_pair = None
-    best_score = 0
+    best_pair = select_best_pair(pairs, preferred_quote,
+                                  min_liquidity, min_volume)
+    if best_pair is not None:
+        return best_pair.get("price_usd")
+
+
+async def get_dex_price(
+    session,
+    token_address: str,
+    preferred_quote=("USDC", "USDT"),
+    min_liquidity=10_000,
+    min_volume=5_000
+):
+    cached = await get_cached_prices_async(DEX, [token_address])
+    if token_address in cached:
+        return cached[token_address]
+
+    price = await _fetch_dex_price(session, token_address, preferred_quote,
+                                   min_liquidity, min_volume)
+    if price is None:
+        await set_missing_prices_async(DEX, [token_address])
+    else:
+        await set_cached_price_async(DEX, token_address, price)
+    return price
+
+
+async def _get_dex_prices_batch(
+    session,
+    token_addresses,
+    preferred_quote=("USDC", "USDT"),
+    min_liquidity=10_000,
+    min_volume=5_000,
+    timeout=DEX_TIMEOUT,
+    rate_limited=True
+):
+    url = DEXSCREENER_TOKEN_URL.format(",".join(token_addresses))
+
+    status, data = await fetch_json(session, url, timeout, DEX, rate_limited)
+    if status != 200:
+        raise RuntimeError(f"Dexscreener error {status}")
+
+    pairs_by_address = {}
+    for pair in data.get("pairs") or []:
+        base_address = pair.get("baseToken", {}).get("address")
+        if base_address:
+            pairs_by_address.setdefault(base_address.lower(), []).append(pair)
+
+    prices = {}
+    for address in token_addresses:
+        best_pair = select_best_pair(
+            pairs_by_address.get(address.lower(), []),
+            preferred_quote, min_liquidity, min_volume
+        )
+        price = best_pair.get("price_usd") if best_pair else None
+        prices[address] = float(price) if price else None
+    return prices
+
+
+async def _prefetch_dex_batch(
+    session,
+    semaphore,
+    token_addresses,
+    preferred_quote,
+    min_liquidity,
+    min_volume,
+    deadline
+):
+    url = DEXSCREENER_TOKEN_URL.format(",".join(token_addresses))
+    async with semaphore:
+        # The rate-limit wait happens before the request timeout starts, so
+        # queued batches are not timed out while they wait for a token.
+        max_wait = None
+        if deadline is not None:
+            max_wait = deadline - time.monotonic()
+        await acquire_rate_limit(url, max_wait=max_wait)
+        timeout = DEX_TIMEOUT
+        if deadline is not None:
+            timeout = min(timeout, deadline - time.monotonic())
+            if timeout <= 0:
+                raise asyncio.TimeoutError("DEX prefetch deadline reached")
+        return await asyncio.wait_for(
+            _get_dex_prices_batch(session, token_addresses, preferred_quote,
+                                  min_liquidity, min_volume, timeout,
+                                  rate_limited=False),
+            timeout,
+        )
+
+
+async def get_dex_prices(
+    session,
+    token_addresses,
+    preferred_quote=("USDC", "USDT"),
+    min_liquidity=10_000,
+    min_volume=5_000,
+    batch_size=DEXSCREENER_MAX_BATCH,
+    deadline=None
+):
+    batch_size = max(1, min(batch_size, DEXSCREENER_MAX_BATCH))
+    addresses = list(dict.fromkeys(token_addresses))
+
+    # Only addresses with an answer are returned; failed or timed-out
+    # batches are left out so the per-asset path can still retry them.
+    prices = await get_cached_prices_async(DEX, addresses)
+    addresses = [address for address in addresses if address not in prices]
+    batches = [addresses[i:i + batch_size]
+               for i in range(0, len(addresses), batch_size)]
 
-    for pair in pairs:
-        liquidity = float(pair.get("liquidity", {}).get("usd") or 0)
-        volume = float(pair.get("volume", {}).get("h24") or 0)
+    _, burst = RATE_LIMITS.get(DEX_HOST, (0, DEXSCREENER_MAX_BATCH))
+    semaphore = asyncio.Semaphore(max(1, int(burst)))
+    results = await asyncio.gather(
+        *(_prefetch_dex_batch(session, semaphore, batch, preferred_quote,
+                              min_liquidity, min_volume, deadline)
+          for batch in batches),
+        return_exceptions=True,
+    )
 
-        if liquidity < min_liquidity or volume < min_volume:
+    fetched = {}
+    for batch, result in zip(batches, results):
+        if isinstance(result, Exception):
+            logger.error(
+                f"DEX batch request failed for {len(batch)} tokens: "
+                f"{result!r}"
+            )
             continue
+        fetched.update(result)
 
-        quote_symbol = pair.get("quoteToken", {}).get("symbol", "")
-
-        score = liquidity * W_LIQUIDITY + volume * W_VOLUME
-
-        if quote_symbol in preferred_quote:
-            score *= 1.2
-
-        if score > best_score:
-            best_score = score
-            best_pair = {
-                "chainId": pair["chainId"],
-                "dexId": pair["dexId"],
-                "pairAddress": pair["pairAddress"],
-                "base": pair["baseToken"]["symbol"],
-                "quote": quote_symbol,
-                "liquidity_usd": liquidity,
-                "volume_24h": volume,
-                "price_usd": pair.get("priceUsd"),
-                "score": round(score, 2)
-            }
-    if best_pair is not None:
-        return best_pair.get("price_usd")
+    await set_cached_prices_async(DEX, fetched)
+    await set_missing_prices_async(
+        DEX, [address for address, price in fetched.items() if price is None]
+    )
+    prices.update(fetched)
+    return prices
 
 
-async def get_cex_price(session, token):
+async def _fetch_cex_price(session, token):
     url = CEX_MEXC_TOKEN_URL.format(token)
-    async with session.get(url, timeout=aiohttp.ClientTimeout(total=5)) as resp:
-        if not (200 <= resp.status < 301):
-            raise RuntimeError(f"MEXC error {resp.status}")
-        data = await resp.json()
-    return data["data"]["indexPrice"]
+    status, data = await fetch_json(session, url, 5, CEX)
+    if not (200 <= status < 301):
+        raise RuntimeError(f"MEXC error {status}")
+    # MEXC answers an unlisted contract with 200 and no data.
+    return (data.get("data") or {}).get("indexPrice")
+
+
+async def get_cex_price(session, token):
+    cached = await get_cached_prices_async(CEX, [token])
+    if token in cached:
+        return cached[token]
+
+    price = await _fetch_cex_price(session, token)
+    if price is None:
+        await set_missing_prices_async(CEX, [token])
+    else:
+        await set_cached_price_async(CEX, token, price)
+    return price
+
+
+async def get_cex_prices_snapshot(session):
+    status, data = await fetch_json(session, CEX_MEXC_TICKER_URL, 5, CEX)
+    if not (200 <= status < 301):
+        raise RuntimeError(f"MEXC ticker error {status}")
+
+    prices = {}
+    for ticker in data.get("data") or []:
+        symbol = ticker.get("symbol") or ""
+        price = ticker.get("indexPrice")
+        if not symbol.endswith(CEX_QUOTE_SUFFIX) or price is None:
+            continue
+        prices[symbol[:-len(CEX_QUOTE_SUFFIX)].upper()] = float(price)
+
+    await set_cached_prices_async(CEX, prices)
+    return prices
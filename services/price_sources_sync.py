@@ -1,36 +1,51 @@
+import time
+
 import requests
-from typing import Optional, Dict, Tuple
+from typing import Optional, Dict, Tuple, Sequence
 from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
 
 from app.core.logger import logger
-
-DEXSCREENER_TOKEN_URL = "https://api.dexscreener.com/latest/dex/tokens/{}"
-CEX_MEXC_TOKEN_URL = (
-    "https://contract.mexc.com/api/v1/contract/index_price/{}_USDT"
+from app.services.pair_scoring import select_best_pair
+from app.services.price_cache import (
+    CEX,
+    DEX,
+    get_cached_prices,
+    set_cached_price,
+    set_cached_prices,
+    set_missing_prices,
+)
+from app.services.circuit_breaker import (
+    CircuitOpenError,
+    check_circuit,
+    record_call,
 )
+from app.services.rate_limiter import (
+    CEX_BASE_URL,
+    DEX_BASE_URL,
+    RateLimitExceeded,
+    acquire as acquire_rate_limit,
+)
+from app.services.source_metrics import source_metrics
 
-W_LIQUIDITY = 0.7
-W_VOLUME = 0.3
+DEXSCREENER_TOKEN_URL = DEX_BASE_URL + "/latest/dex/tokens/{}"
+DEXSCREENER_MAX_BATCH = 30
+CEX_MEXC_TOKEN_URL = CEX_BASE_URL + "/api/v1/contract/index_price/{}_USDT"
+CEX_MEXC_TICKER_URL = CEX_BASE_URL + "/api/v1/contract/ticker"
+CEX_QUOTE_SUFFIX = "_USDT"
 
 DEX_TIMEOUT = 10
 CEX_TIMEOUT = 5
 
 
-def create_http_session() -> requests.Session:
+def create_http_session(pool_maxsize: int = 10) -> requests.Session:
     session = requests.Session()
 
-    retry_strategy = Retry(
-        total=3,
-        backoff_factor=1,
-        status_forcelist=[429, 500, 502, 503, 504],
-        allowed_methods=["GET", "POST"],
-    )
-
+    # No transport retries: a failing upstream is handled by the circuit
+    # breaker and the cycle deadline, and each request is one outcome.
     adapter = HTTPAdapter(
-        max_retries=retry_strategy,
+        max_retries=0,
         pool_connections=10,
-        pool_maxsize=10,
+        pool_maxsize=pool_maxsize,
         pool_block=False,
     )
 
@@ -47,7 +62,46 @@ def create_http_session() -> requests.Session:
     return session
 
 
-def get_dex_price(
+def _get(
+    session: requests.Session,
+    url: str,
+    timeout: float,
+    source: str,
+) -> requests.Response:
+    check_circuit(url)
+    # Waiting for a token longer than the request may take is pointless,
+    # and the wait comes out of the request's own budget.
+    waited = time.monotonic()
+    acquire_rate_limit(url, max_wait=timeout)
+    timeout = max(timeout - (time.monotonic() - waited), 0.001)
+
+    started = time.monotonic()
+    try:
+        response = session.get(url, timeout=timeout)
+    except requests.RequestException as e:
+        latency = time.monotonic() - started
+        record_call(url, False, latency)
+        source_metrics.observe(
+            source,
+            latency,
+            error=True,
+            timeout=isinstance(e, requests.Timeout),
+        )
+        raise
+
+    latency = time.monotonic() - started
+    ok = response.status_code < 500 and response.status_code != 429
+    record_call(url, ok, latency)
+    source_metrics.observe(
+        source,
+        latency,
+        bytes_received=len(response.content),
+        error=response.status_code >= 400,
+    )
+    return response
+
+
+def _fetch_dex_price(
     session: requests.Session,
     token_address: str,
     preferred_quote: Tuple[str, ...] = ("USDC", "USDT"),
@@ -60,7 +114,7 @@ def get_dex_price(
     try:
         logger.debug(f"Fetching DEX price for {token_address}")
 
-        response = session.get(url, timeout=timeout)
+        response = _get(session, url, timeout, DEX)
 
         if response.status_code != 200:
             logger.error(
@@ -74,38 +128,15 @@ def get_dex_price(
 
         if not pairs:
             logger.warning(f"No pairs found for token {token_address}")
+            set_missing_prices(DEX, [token_address])
             return None
 
-        best_pair = None
-        best_score = 0
-
-        for pair in pairs:
-            liquidity = float(pair.get("liquidity", {}).get("usd") or 0)
-            volume = float(pair.get("volume", {}).get("h24") or 0)
-
-            if liquidity < min_liquidity or volume < min_volume:
-                continue
-
-            quote_symbol = pair.get("quoteToken", {}).get("symbol", "")
-
-            score = liquidity * W_LIQUIDITY + volume * W_VOLUME
-
-            if quote_symbol in preferred_quote:
-                score *= 1.2
-
-            if score > best_score:
-                best_score = score
-                best_pair = {
-                    "chainId": pair.get("chainId"),
-                    "dexId": pair.get("dexId"),
-                    "pairAddress": pair.get("pairAddress"),
-                    "base": pair.get("baseToken", {}).get("symbol"),
-                    "quote": quote_symbol,
-                    "liquidity_usd": liquidity,
-                    "volume_24h": volume,
-                    "price_usd": pair.get("priceUsd"),
-                    "score": round(score, 2),
-                }
+        best_pair = select_best_pair(
+            pairs,
+            preferred_quote=preferred_quote,
+            min_liquidity=min_liquidity,
+            min_volume=min_volume,
+        )
 
         if best_pair is not None:
             price = best_pair.get("price_usd")
@@ -121,8 +152,12 @@ def get_dex_price(
             f"(min_liquidity=${min_liquidity:,.0f}, "
             f"min_volume=${min_volume:,.0f})"
         )
+        set_missing_prices(DEX, [token_address])
         return None
 
+    except (CircuitOpenError, RateLimitExceeded) as e:
+        logger.warning(f"DEX price skipped for {token_address}: {e}")
+        return None
     except requests.Timeout:
         logger.error(f"DEX price request timeout for {token_address}")
         return None
@@ -140,7 +175,134 @@ def get_dex_price(
         return None
 
 
-def get_cex_price(
+def get_dex_price(
+    session: requests.Session,
+    token_address: str,
+    preferred_quote: Tuple[str, ...] = ("USDC", "USDT"),
+    min_liquidity: float = 10000,
+    min_volume: float = 5000,
+    timeout: int = DEX_TIMEOUT,
+) -> Optional[float]:
+    cached = get_cached_prices(DEX, [token_address])
+    if token_address in cached:
+        return cached[token_address]
+
+    price = _fetch_dex_price(
+        session,
+        token_address,
+        preferred_quote=preferred_quote,
+        min_liquidity=min_liquidity,
+        min_volume=min_volume,
+        timeout=timeout,
+    )
+    set_cached_price(DEX, token_address, price)
+    return price
+
+
+def get_dex_prices(
+    session: requests.Session,
+    token_addresses: Sequence[str],
+    preferred_quote: Tuple[str, ...] = ("USDC", "USDT"),
+    min_liquidity: float = 10000,
+    min_volume: float = 5000,
+    timeout: int = DEX_TIMEOUT,
+    batch_size: int = DEXSCREENER_MAX_BATCH,
+    deadline: Optional[float] = None,
+) -> Dict[str, Optional[float]]:
+    batch_size = max(1, min(batch_size, DEXSCREENER_MAX_BATCH))
+    addresses = list(dict.fromkeys(token_addresses))
+
+    # Only addresses with an answer are returned; failed or timed-out
+    # batches are left out so the per-asset path can still retry them.
+    prices: Dict[str, Optional[float]] = dict(
+        get_cached_prices(DEX, addresses)
+    )
+    addresses = [address for address in addresses if address not in prices]
+    fetched: Dict[str, Optional[float]] = {}
+
+    for start in range(0, len(addresses), batch_size):
+        batch = addresses[start:start + batch_size]
+        url = DEXSCREENER_TOKEN_URL.format(",".join(batch))
+
+        batch_timeout = timeout
+        if deadline is not None:
+            batch_timeout = min(timeout, deadline - time.monotonic())
+            if batch_timeout <= 0:
+                logger.warning(
+                    f"DEX batch deadline reached, "
+                    f"{len(addresses) - start} tokens not requested"
+                )
+                break
+
+        try:
+            logger.debug(f"Fetching DEX prices for {len(batch)} tokens")
+
+            response = _get(session, url, batch_timeout, DEX)
+
+            if response.status_code != 200:
+                logger.error(
+                    f"DexScreener batch error: "
+                    f"status={response.status_code}, tokens={len(batch)}"
+                )
+                continue
+
+            data = response.json()
+            pairs_by_address: Dict[str, list] = {}
+            for pair in data.get("pairs") or []:
+                base_address = pair.get("baseToken", {}).get("address")
+                if base_address:
+                    pairs_by_address.setdefault(
+                        base_address.lower(), []
+                    ).append(pair)
+
+            for address in batch:
+                pairs = pairs_by_address.get(address.lower())
+                if not pairs:
+                    logger.warning(f"No pairs found for token {address}")
+                    fetched[address] = None
+                    continue
+
+                best_pair = select_best_pair(
+                    pairs,
+                    preferred_quote=preferred_quote,
+                    min_liquidity=min_liquidity,
+                    min_volume=min_volume,
+                )
+                price = best_pair.get("price_usd") if best_pair else None
+
+                fetched[address] = float(price) if price else None
+                if not price:
+                    logger.warning(
+                        f"No suitable pairs found for {address} "
+                        f"(min_liquidity=${min_liquidity:,.0f}, "
+                        f"min_volume=${min_volume:,.0f})"
+                    )
+
+        except (CircuitOpenError, RateLimitExceeded) as e:
+            logger.warning(f"DEX batch skipped for {len(batch)} tokens: {e}")
+        except requests.Timeout:
+            logger.error(
+                f"DEX batch request timeout for {len(batch)} tokens"
+            )
+        except requests.RequestException as e:
+            logger.error(f"DEX batch request failed: {e}")
+        except (KeyError, ValueError, TypeError) as e:
+            logger.error(f"DEX batch parsing error: {e}")
+        except Exception as e:
+            logger.error(
+                f"Unexpected error getting DEX batch prices: {e}",
+                exc_info=True,
+            )
+
+    set_cached_prices(DEX, fetched)
+    set_missing_prices(
+        DEX, [address for address, price in fetched.items() if price is None]
+    )
+    prices.update(fetched)
+    return prices
+
+
+def _fetch_cex_price(
     session: requests.Session,
     token_symbol: str,
     timeout: int = CEX_TIMEOUT,
@@ -150,7 +312,7 @@ def get_cex_price(
     try:
         logger.debug(f"Fetching CEX price for {token_symbol}")
 
-        response = session.get(url, timeout=timeout)
+        response = _get(session, url, timeout, CEX)
 
         if not (200 <= response.status_code < 300):
             logger.error(
@@ -167,8 +329,12 @@ def get_cex_price(
             return float(price)
 
         logger.warning(f"No price data in MEXC response for {token_symbol}")
+        set_missing_prices(CEX, [token_symbol])
         return None
 
+    except (CircuitOpenError, RateLimitExceeded) as e:
+        logger.warning(f"CEX price skipped for {token_symbol}: {e}")
+        return None
     except requests.Timeout:
         logger.error(f"CEX price request timeout for {token_symbol}")
         return None
@@ -186,6 +352,70 @@ def get_cex_price(
         return None
 
 
+def get_cex_price(
+    session: requests.Session,
+    token_symbol: str,
+    timeout: int = CEX_TIMEOUT,
+) -> Optional[float]:
+    cached = get_cached_prices(CEX, [token_symbol])
+    if token_symbol in cached:
+        return cached[token_symbol]
+
+    price = _fetch_cex_price(session, token_symbol, timeout=timeout)
+    set_cached_price(CEX, token_symbol, price)
+    return price
+
+
+def get_cex_prices_snapshot(
+    session: requests.Session,
+    timeout: int = CEX_TIMEOUT,
+) -> Dict[str, float]:
+    try:
+        logger.debug("Fetching MEXC contract ticker snapshot")
+
+        response = _get(session, CEX_MEXC_TICKER_URL, timeout, CEX)
+
+        if not (200 <= response.status_code < 300):
+            logger.error(
+                f"MEXC ticker error: status={response.status_code}"
+            )
+            return {}
+
+        data = response.json()
+        tickers = data.get("data") or []
+
+        prices: Dict[str, float] = {}
+        for ticker in tickers:
+            symbol = ticker.get("symbol") or ""
+            price = ticker.get("indexPrice")
+            if not symbol.endswith(CEX_QUOTE_SUFFIX) or price is None:
+                continue
+            prices[symbol[:-len(CEX_QUOTE_SUFFIX)].upper()] = float(price)
+
+        logger.debug(f"MEXC ticker snapshot: {len(prices)} symbols")
+        set_cached_prices(CEX, prices)
+        return prices
+
+    except (CircuitOpenError, RateLimitExceeded) as e:
+        logger.warning(f"MEXC ticker skipped: {e}")
+        return {}
+    except requests.Timeout:
+        logger.error("MEXC ticker request timeout")
+        return {}
+    except requests.RequestException as e:
+        logger.error(f"MEXC ticker request failed: {e}")
+        return {}
+    except (KeyError, ValueError, TypeError) as e:
+        logger.error(f"MEXC ticker parsing error: {e}")
+        return {}
+    except Exception as e:
+        logger.error(
+            f"Unexpected error getting MEXC ticker snapshot: {e}",
+            exc_info=True,
+        )
+        return {}
+
+
 def check_price_apis_health(
     session: Optional[requests.Session] = None,
 ) -> Dict[str, str]:
@@ -1,10 +1,18 @@
+import asyncio
+import os
+
 from app.crud.prices import create_price as create_price_crud
 from app.models.prices import Price
 from app.crud.token import get_token_from_db
 from app.crud.token import get_token_from_db_for_id
+from app.services.http_clients import get_async_http_session
 from app.services.price_sources import get_cex_price, get_dex_price
 from app.dependencies import async_session
-import aiohttp
+from app.core.logger import logger
+
+DEX_TIMEOUT = 10
+CEX_TIMEOUT = 5
+PRICE_FETCH_DEADLINE = float(os.getenv("PRICE_FETCH_DEADLINE", "10"))
 
 
 class TokenNotFound(Exception):
@@ -21,16 +29,9 @@ async def create_price_service(value: str) -> Price:
         if not token:
             raise TokenNotFound()
 
-        async with aiohttp.ClientSession() as session:
-            price_dex = await get_dex_price(session, token.address)
-            price_cex = await get_cex_price(session, token.cex_symbol)
-
-        if price_dex is None or price_cex is None:
-            raise PriceSourceError()
-
-        price_dex = float(price_dex)
-        price_cex = float(price_cex)
-        spread = abs(price_dex - price_cex) / price_cex * 100
+        price_dex, price_cex, spread = await fetch_asset_prices(
+            get_async_http_session(), token.address, token.cex_symbol
+        )
 
         orm_price = Price(
             token_id=token.id,
@@ -49,15 +50,9 @@ async def create_price_service_for_celery(session,
         if not token:
             raise TokenNotFound()
 
-        price_dex = await get_dex_price(session, token.address)
-        price_cex = await get_cex_price(session, token.cex_symbol)
-
-        if price_dex is None or price_cex is None:
-            raise PriceSourceError()
-
-        price_dex = float(price_dex)
-        price_cex = float(price_cex)
-        spread = abs(price_dex - price_cex) / price_cex * 100
+        price_dex, price_cex, spread = await fetch_asset_prices(
+            session, token.address, token.cex_symbol
+        )
 
         orm_price = Price(
             token_id=token.id,
@@ -67,3 +62,66 @@ async def create_price_service_for_celery(session,
         )
 
         return await create_price_crud(db, orm_price)
+
+
+async def _fetch_source(source: str, coro, timeout: float):
+    try:
+        return await asyncio.wait_for(coro, timeout)
+    except asyncio.TimeoutError:
+        logger.error(f"{source} price request timed out after {timeout}s")
+    except Exception as e:
+        logger.error(f"{source} price request failed: {e!r}")
+    return None
+
+
+async def fetch_asset_prices(session,
+                             address: str,
+                             cex_symbol: str,
+                             dex_prices: dict | None = None,
+                             cex_prices: dict | None = None,
+                             deadline: float = PRICE_FETCH_DEADLINE
+                             ) -> tuple[float, float, float]:
+    lookups = {}
+
+    price_dex = None
+    if dex_prices is not None and address in dex_prices:
+        price_dex = dex_prices[address]
+    else:
+        lookups["dex"] = asyncio.ensure_future(_fetch_source(
+            "DEX", get_dex_price(session, address),
+            min(DEX_TIMEOUT, deadline)
+        ))
+
+    price_cex = None
+    if cex_prices:
+        price_cex = cex_prices.get(cex_symbol.upper())
+    if price_cex is None:
+        lookups["cex"] = asyncio.ensure_future(_fetch_source(
+            "CEX", get_cex_price(session, cex_symbol),
+            min(CEX_TIMEOUT, deadline)
+        ))
+
+    if lookups:
+        done, pending = await asyncio.wait(lookups.values(), timeout=deadline)
+        for task in pending:
+            task.cancel()
+        if pending:
+            logger.error(
+                f"Price lookups for {address} / {cex_symbol} "
+                f"missed the {deadline}s deadline"
+            )
+        if lookups.get("dex") in done:
+            price_dex = lookups["dex"].result()
+        if lookups.get("cex") in done:
+            price_cex = lookups["cex"].result()
+
+    if price_dex is None or price_cex is None:
+        raise PriceSourceError(
+            f"Could not fetch price(s) for {address} / {cex_symbol}"
+        )
+
+    price_dex = float(price_dex)
+    price_cex = float(price_cex)
+    spread = abs(price_dex - price_cex) / price_cex * 100
+
+    return price_dex, price_cex, spread
@@ -1,18 +1,34 @@
+import os
 import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Optional
+
 import requests
 
 from app.models.prices import Price
 from app.crud.token_sync import get_token_from_db, get_token_from_db_for_id
 from app.crud.prices_sync import create_price as create_price_crud
 from app.services.price_sources_sync import (
+    CEX_TIMEOUT,
+    DEX_TIMEOUT,
     get_dex_price,
     get_cex_price,
-    create_http_session,
 )
+from app.services.http_clients import get_http_session
 from app.dependencies_sync import get_db
 from app.core.logger import logger
 
 
+PRICE_FETCH_DEADLINE = float(os.getenv("PRICE_FETCH_DEADLINE", "10"))
+SOURCE_FETCH_WORKERS = int(os.getenv("SOURCE_FETCH_WORKERS", "20"))
+
+_source_executor = ThreadPoolExecutor(
+    max_workers=SOURCE_FETCH_WORKERS,
+    thread_name_prefix="price-source",
+)
+
+
 class TokenNotFound(Exception):
     pass
 
@@ -27,81 +43,133 @@ def create_price_service(value: str) -> Price:
         if not token:
             raise TokenNotFound(f"Token not found: {value}")
 
-        http_session = create_http_session()
-
-        try:
-            price_dex = get_dex_price(http_session, token.address)
-            price_cex = get_cex_price(http_session, token.cex_symbol)
-
-            if price_dex is None or price_cex is None:
-                missing = []
-                if price_dex is None:
-                    missing.append("DEX")
-                if price_cex is None:
-                    missing.append("CEX")
-                raise PriceSourceError(
-                    f"Could not fetch {', '.join(missing)} "
-                    f"price(s) for token {value}"
-                )
+        price_dex, price_cex, spread = fetch_asset_prices(
+            get_http_session(),
+            token.address,
+            token.cex_symbol,
+        )
+
+        orm_price = Price(
+            token_id=token.id,
+            price_dex=price_dex,
+            price_cex=price_cex,
+            spread=spread,
+        )
+
+        result = create_price_crud(db, orm_price)
+
+        logger.info(
+            f"Price created for token {value}: "
+            f"DEX=${price_dex:.6f}, CEX=${price_cex:.6f}, "
+            f"spread={spread:.2f}%"
+        )
+
+        return result
+
+
+def _fetch_source(fetch, http_session, key: str, cap: float, until: float):
+    # The timeout is taken when the worker picks the request up, so a
+    # request queued behind others never outlives the caller's deadline.
+    timeout = min(cap, until - time.monotonic())
+    if timeout <= 0:
+        logger.debug(f"Price request for {key} expired in the queue")
+        return None
+    return fetch(http_session, key, timeout=timeout)
 
-            price_dex = float(price_dex)
-            price_cex = float(price_cex)
 
-            spread = abs(price_dex - price_cex) / price_cex * 100
+def _wait_for_source(future, started: float, deadline: float, name: str):
+    remaining = max(0.0, deadline - (time.monotonic() - started))
+    try:
+        return future.result(timeout=remaining)
+    except FutureTimeoutError:
+        logger.error(f"Price for {name} missed the {deadline}s deadline")
+        return None
 
-            orm_price = Price(
-                token_id=token.id,
-                price_dex=price_dex,
-                price_cex=price_cex,
-                spread=spread,
-            )
 
-            result = create_price_crud(db, orm_price)
+def fetch_asset_prices(
+    http_session: requests.Session,
+    address: str,
+    cex_symbol: str,
+    dex_prices: Optional[dict[str, Optional[float]]] = None,
+    cex_prices: Optional[dict[str, float]] = None,
+    deadline: float = PRICE_FETCH_DEADLINE,
+) -> tuple[float, float, float]:
+    started = time.monotonic()
+
+    dex_future = None
+    if dex_prices is not None and address in dex_prices:
+        price_dex = dex_prices[address]
+    else:
+        price_dex = None
+        dex_future = _source_executor.submit(
+            _fetch_source,
+            get_dex_price,
+            http_session,
+            address,
+            DEX_TIMEOUT,
+            started + deadline,
+        )
 
-            logger.info(
-                f"Price created for token {value}: "
-                f"DEX=${price_dex:.6f}, CEX=${price_cex:.6f}, "
-                f"spread={spread:.2f}%"
-            )
+    cex_future = None
+    price_cex = None
+    if cex_prices:
+        price_cex = cex_prices.get(cex_symbol.upper())
+    if price_cex is None:
+        cex_future = _source_executor.submit(
+            _fetch_source,
+            get_cex_price,
+            http_session,
+            cex_symbol,
+            CEX_TIMEOUT,
+            started + deadline,
+        )
 
-            return result
+    if dex_future is not None:
+        price_dex = _wait_for_source(dex_future, started, deadline, address)
+    if cex_future is not None:
+        price_cex = _wait_for_source(cex_future, started, deadline, cex_symbol)
+
+    if price_dex is None or price_cex is None:
+        missing = []
+        if price_dex is None:
+            missing.append(f"DEX (address: {address})")
+        if price_cex is None:
+            missing.append(f"CEX (symbol: {cex_symbol})")
+        raise PriceSourceError(
+            f"Could not fetch {', '.join(missing)} price(s)"
+        )
 
-        finally:
-            http_session.close()
+    price_dex = float(price_dex)
+    price_cex = float(price_cex)
+
+    spread = abs(price_dex - price_cex) / price_cex * 100
+
+    return price_dex, price_cex, spread
 
 
 def create_price_service_for_celery(
     http_session: requests.Session,
     token_id: int,
     rate_limit_delay: float = 0.0,
+    dex_prices: Optional[dict[str, Optional[float]]] = None,
+    cex_prices: Optional[dict[str, float]] = None,
 ) -> Price:
     with get_db() as db:
         token = get_token_from_db_for_id(db, token_id)
         if not token:
             raise TokenNotFound(f"Token with id {token_id} not found")
 
-        price_dex = get_dex_price(http_session, token.address)
-        price_cex = get_cex_price(http_session, token.cex_symbol)
+        price_dex, price_cex, spread = fetch_asset_prices(
+            http_session,
+            token.address,
+            token.cex_symbol,
+            dex_prices=dex_prices,
+            cex_prices=cex_prices,
+        )
 
         if rate_limit_delay > 0:
             time.sleep(rate_limit_delay)
 
-        if price_dex is None or price_cex is None:
-            missing = []
-            if price_dex is None:
-                missing.append(f"DEX (address: {token.address})")
-            if price_cex is None:
-                missing.append(f"CEX (symbol: {token.cex_symbol})")
-            raise PriceSourceError(
-                f"Could not fetch {', '.join(missing)} "
-                f"price(s) for token_id={token_id}"
-            )
-
-        price_dex = float(price_dex)
-        price_cex = float(price_cex)
-
-        spread = abs(price_dex - price_cex) / price_cex * 100
-
         orm_price = Price(
             token_id=token.id,
             price_dex=price_dex,
@@ -123,38 +191,34 @@ def create_price_service_for_celery(
 def batch_create_prices_for_tokens(
     token_ids: list[int],
     max_workers: int = 5,
-    rate_limit_delay: float = 1.0,
+    rate_limit_delay: float = 0.0,
 ) -> dict:
     from concurrent.futures import ThreadPoolExecutor, as_completed
 
     stats = {"success": 0, "failed": 0, "total": len(token_ids)}
 
-    http_session = create_http_session()
+    http_session = get_http_session()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        future_to_token = {
+            executor.submit(
+                create_price_service_for_celery,
+                http_session,
+                token_id,
+                rate_limit_delay,
+            ): token_id
+            for token_id in token_ids
+        }
+
+        for future in as_completed(future_to_token):
+            token_id = future_to_token[future]
+            try:
+                future.result()
+                stats["success"] += 1
+            except Exception as e:
+                stats["failed"] += 1
+                logger.error(
+                    f"Failed to create price for token_id={token_id}: {e}"
+                )
 
-    try:
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            future_to_token = {
-                executor.submit(
-                    create_price_service_for_celery,
-                    http_session,
-                    token_id,
-                    rate_limit_delay,
-                ): token_id
-                for token_id in token_ids
-            }
-
-            for future in as_completed(future_to_token):
-                token_id = future_to_token[future]
-                try:
-                    future.result()
-                    stats["success"] += 1
-                except Exception as e:
-                    stats["failed"] += 1
-                    logger.error(
-                        f"Failed to create price for token_id={token_id}: {e}"
-                    )
-
-        return stats
-
-    finally:
-        http_session.close()
+    return stats
@@ -0,0 +1,189 @@
+import asyncio
+import os
+import time
+import weakref
+from typing import Optional
+from urllib.parse import urlparse
+
+import redis
+import redis.asyncio as aioredis
+
+from app.core.logger import logger
+from app.services.redis_clients import get_async_redis, get_redis
+
+RATE_LIMIT_KEY = "ratelimit:{}"
+
+DEX_BASE_URL = os.getenv(
+    "DEXSCREENER_BASE_URL", "https://api.dexscreener.com"
+).rstrip("/")
+CEX_BASE_URL = os.getenv(
+    "MEXC_CONTRACT_BASE_URL", "https://contract.mexc.com"
+).rstrip("/")
+
+DEX_HOST = urlparse(DEX_BASE_URL).netloc
+CEX_HOST = urlparse(CEX_BASE_URL).netloc
+
+RATE_LIMITS = {
+    DEX_HOST: (
+        float(os.getenv("DEX_RATE_LIMIT", "5")),
+        float(os.getenv("DEX_RATE_BURST", "10")),
+    ),
+    CEX_HOST: (
+        float(os.getenv("CEX_RATE_LIMIT", "10")),
+        float(os.getenv("CEX_RATE_BURST", "20")),
+    ),
+}
+
+# Every caller takes a token, letting the balance go negative: the
+# result is how long that caller has to wait for its reserved slot, so
+# blocked callers are served in order and sleep exactly once. A caller
+# that would wait longer than ARGV[3] seconds (when >= 0) reserves
+# nothing and gets the needed wait back negated.
+TOKEN_BUCKET_LUA = """
+if redis.replicate_commands then
+    redis.replicate_commands()
+end
+local key = KEYS[1]
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local max_wait = tonumber(ARGV[3])
+local now_raw = redis.call('TIME')
+local now = tonumber(now_raw[1]) + tonumber(now_raw[2]) / 1000000
+local state = redis.call('HMGET', key, 'tokens', 'ts')
+local tokens = tonumber(state[1])
+local ts = tonumber(state[2])
+if tokens == nil or ts == nil then
+    tokens = burst
+    ts = now
+end
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens < 1 then
+    wait = (1 - tokens) / rate
+end
+if max_wait >= 0 and wait > max_wait then
+    return tostring(-wait)
+end
+tokens = tokens - 1
+redis.call('HSET', key, 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', key, math.ceil((burst - tokens) / rate) + 1)
+return tostring(wait)
+"""
+
+
+class RateLimitExceeded(Exception):
+    pass
+
+
+def _max_wait_arg(max_wait: Optional[float]) -> float:
+    return -1 if max_wait is None else max(max_wait, 0.0)
+
+
+class TokenBucket:
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        host: str,
+        rate: float,
+        burst: float,
+    ):
+        self.host = host
+        self.key = RATE_LIMIT_KEY.format(host)
+        self.rate = rate
+        self.burst = burst
+        self._script = redis_client.register_script(TOKEN_BUCKET_LUA)
+
+    def reserve(self, max_wait: Optional[float] = None) -> float:
+        wait = self._script(
+            keys=[self.key],
+            args=[self.rate, self.burst, _max_wait_arg(max_wait)],
+        )
+        return float(wait)
+
+    def acquire(self, max_wait: Optional[float] = None) -> None:
+        wait = self.reserve(max_wait)
+        if wait < 0:
+            raise RateLimitExceeded(
+                f"Rate limit for {self.host} needs a {-wait:.2f}s wait"
+            )
+        if wait > 0:
+            time.sleep(wait)
+
+
+class AsyncTokenBucket:
+    def __init__(
+        self,
+        redis_client: aioredis.Redis,
+        host: str,
+        rate: float,
+        burst: float,
+    ):
+        self.host = host
+        self.key = RATE_LIMIT_KEY.format(host)
+        self.rate = rate
+        self.burst = burst
+        self._script = redis_client.register_script(TOKEN_BUCKET_LUA)
+
+    async def reserve(self, max_wait: Optional[float] = None) -> float:
+        wait = await self._script(
+            keys=[self.key],
+            args=[self.rate, self.burst, _max_wait_arg(max_wait)],
+        )
+        return float(wait)
+
+    async def acquire(self, max_wait: Optional[float] = None) -> None:
+        wait = await self.reserve(max_wait)
+        if wait < 0:
+            raise RateLimitExceeded(
+                f"Rate limit for {self.host} needs a {-wait:.2f}s wait"
+            )
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+_buckets: dict[str, TokenBucket] = {}
+# Keyed by client, and so by event loop, like redis_clients.
+_async_buckets: "weakref.WeakKeyDictionary[aioredis.Redis, dict[str, AsyncTokenBucket]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _host_for(url: str) -> Optional[str]:
+    host = urlparse(url).netloc
+    return host if host in RATE_LIMITS else None
+
+
+def _get_bucket(host: str) -> TokenBucket:
+    if host not in _buckets:
+        rate, burst = RATE_LIMITS[host]
+        _buckets[host] = TokenBucket(get_redis(), host, rate, burst)
+    return _buckets[host]
+
+
+def _get_async_bucket(host: str) -> AsyncTokenBucket:
+    redis_client = get_async_redis()
+    buckets = _async_buckets.setdefault(redis_client, {})
+    if host not in buckets:
+        rate, burst = RATE_LIMITS[host]
+        buckets[host] = AsyncTokenBucket(redis_client, host, rate, burst)
+    return buckets[host]
+
+
+def acquire(url: str, max_wait: Optional[float] = None) -> None:
+    host = _host_for(url)
+    if host is None:
+        return
+    try:
+        _get_bucket(host).acquire(max_wait)
+    except redis.RedisError as e:
+        logger.warning(f"Rate limiter unavailable for {host}: {e}")
+
+
+async def acquire_async(url: str, max_wait: Optional[float] = None) -> None:
+    host = _host_for(url)
+    if host is None:
+        return
+    try:
+        await _get_async_bucket(host).acquire(max_wait)
+    except redis.RedisError as e:
+        logger.warning(f"Rate limiter unavailable for {host}: {e}")
@@ -0,0 +1,48 @@
+import asyncio
+import os
+import threading
+import weakref
+from typing import Optional
+
+import redis
+import redis.asyncio as aioredis
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+REDIS_SOCKET_TIMEOUT = 1.0
+
+_lock = threading.Lock()
+_redis_client: Optional[redis.Redis] = None
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aioredis.Redis]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_redis() -> redis.Redis:
+    global _redis_client
+    with _lock:
+        if _redis_client is None:
+            _redis_client = redis.from_url(
+                REDIS_URL,
+                socket_timeout=REDIS_SOCKET_TIMEOUT,
+                socket_connect_timeout=REDIS_SOCKET_TIMEOUT,
+            )
+        return _redis_client
+
+
+def get_async_redis() -> aioredis.Redis:
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = aioredis.from_url(
+            REDIS_URL,
+            socket_timeout=REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=REDIS_SOCKET_TIMEOUT,
+        )
+        _async_clients[loop] = client
+    return client
+
+
+async def close_async_redis() -> None:
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
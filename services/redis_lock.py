@@ -0,0 +1,159 @@
+import threading
+import uuid
+from typing import Callable, Optional
+
+import redis
+
+from app.core.logger import logger
+
+LOCK_ACQUIRE_LUA = """
+if redis.call('SET', KEYS[1], ARGV[1], 'NX', 'PX', ARGV[2]) then
+    return redis.call('INCR', KEYS[2])
+end
+return 0
+"""
+
+LOCK_RENEW_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+FENCE_ADVANCE_LUA = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+local current = tonumber(redis.call('GET', KEYS[2]) or '0')
+if current < tonumber(ARGV[2]) then
+    redis.call('SET', KEYS[2], ARGV[2])
+end
+return redis.call('INCR', KEYS[2])
+"""
+
+LOCK_RELEASE_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class RedisLock:
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        lock_key: str,
+        timeout: int,
+        renew_interval: Optional[float] = None,
+        fence_floor: Optional[Callable[[], int]] = None,
+    ):
+        self.redis_client = redis_client
+        self.lock_key = lock_key
+        self.fence_key = f"{lock_key}:fence"
+        self.timeout = timeout
+        self.renew_interval = renew_interval or timeout / 3
+        self.fence_floor = fence_floor
+        self.task_id = str(uuid.uuid4())
+        self.lock_acquired = False
+        self.fencing_token: Optional[int] = None
+        self.lost = threading.Event()
+
+        self._acquire = redis_client.register_script(LOCK_ACQUIRE_LUA)
+        self._renew = redis_client.register_script(LOCK_RENEW_LUA)
+        self._advance = redis_client.register_script(FENCE_ADVANCE_LUA)
+        self._release = redis_client.register_script(LOCK_RELEASE_LUA)
+        self._stop = threading.Event()
+        self._renewer: Optional[threading.Thread] = None
+
+    @property
+    def _ttl_ms(self) -> int:
+        return int(self.timeout * 1000)
+
+    def _seed_fence(self) -> None:
+        # A flushed or evicted counter would restart at 1 and every write
+        # would be fenced off, so restart it from the last accepted token.
+        if self.fence_floor is None or self.redis_client.exists(self.fence_key):
+            return
+        try:
+            floor = self.fence_floor()
+        except Exception as e:
+            logger.error(
+                f"Could not load fencing floor for {self.lock_key}: {e}"
+            )
+            return
+        if self.redis_client.set(self.fence_key, floor, nx=True):
+            logger.warning(
+                f"Fencing counter {self.fence_key} was missing, "
+                f"seeded from the database at {floor}"
+            )
+
+    def advance_fence(self, floor: int) -> Optional[int]:
+        token = self._advance(
+            keys=[self.lock_key, self.fence_key],
+            args=[self.task_id, floor],
+        )
+        if not token:
+            return None
+        self.fencing_token = int(token)
+        return self.fencing_token
+
+    def __enter__(self) -> "RedisLock":
+        self._seed_fence()
+        token = self._acquire(
+            keys=[self.lock_key, self.fence_key],
+            args=[self.task_id, self._ttl_ms],
+        )
+
+        if not token:
+            current_lock = self.redis_client.get(self.lock_key)
+            lock_ttl = self.redis_client.ttl(self.lock_key)
+            logger.warning(
+                f"Lock already held by {current_lock}, TTL: {lock_ttl}s"
+            )
+            return self
+
+        self.lock_acquired = True
+        self.fencing_token = int(token)
+        self._renewer = threading.Thread(
+            target=self._renew_loop,
+            name=f"lock-renew:{self.lock_key}",
+            daemon=True,
+        )
+        self._renewer.start()
+        logger.info(
+            f"Lock acquired: {self.task_id} (fence {self.fencing_token})"
+        )
+        return self
+
+    def _renew_loop(self) -> None:
+        while not self._stop.wait(self.renew_interval):
+            try:
+                renewed = self._renew(
+                    keys=[self.lock_key],
+                    args=[self.task_id, self._ttl_ms],
+                )
+            except redis.RedisError as e:
+                logger.warning(f"Lock renewal failed for {self.lock_key}: {e}")
+                continue
+
+            if not renewed:
+                self.lost.set()
+                logger.error(
+                    f"Lock lost: {self.task_id} (fence {self.fencing_token})"
+                )
+                return
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if not self.lock_acquired:
+            return
+
+        self._stop.set()
+        if self._renewer is not None:
+            self._renewer.join()
+
+        try:
+            if self._release(keys=[self.lock_key], args=[self.task_id]):
+                logger.info(f"Lock released: {self.task_id}")
+        except redis.RedisError as e:
+            logger.error(f"Error releasing lock: {e}")
@@ -0,0 +1,130 @@
+import os
+import time
+from typing import Optional, Sequence
+
+import redis
+
+from app.core.logger import logger
+from app.schemas.token import TokenAsset
+
+REFRESH_DUE_KEY = "prices:refresh:due"
+REFRESH_LAST_PRICE_KEY = "prices:refresh:last_price"
+
+MIN_REFRESH_INTERVAL = float(os.getenv("MIN_REFRESH_INTERVAL", "10"))
+MAX_REFRESH_INTERVAL = float(os.getenv("MAX_REFRESH_INTERVAL", "300"))
+CHANGE_REFERENCE_PCT = float(os.getenv("REFRESH_CHANGE_REFERENCE_PCT", "1.0"))
+SPREAD_REFERENCE_PCT = float(os.getenv("REFRESH_SPREAD_REFERENCE_PCT", "2.0"))
+THRESHOLD_PROXIMITY_PCT = float(
+    os.getenv("REFRESH_THRESHOLD_PROXIMITY_PCT", "0.5")
+)
+REFRESH_STATE_TTL = int(MAX_REFRESH_INTERVAL * 10)
+
+
+def refresh_interval(
+    change_pct: float,
+    spread: float,
+    threshold_gap: Optional[float] = None,
+) -> float:
+    activity = max(
+        abs(change_pct) / CHANGE_REFERENCE_PCT,
+        abs(spread) / SPREAD_REFERENCE_PCT,
+    )
+    if threshold_gap is not None:
+        activity = max(
+            activity,
+            1 - min(threshold_gap / THRESHOLD_PROXIMITY_PCT, 1),
+        )
+
+    activity = min(activity, 1.0)
+    ratio = MAX_REFRESH_INTERVAL / MIN_REFRESH_INTERVAL
+    return MAX_REFRESH_INTERVAL / (1 + activity * (ratio - 1))
+
+
+class RefreshScheduler:
+    def __init__(self, redis_client: redis.Redis):
+        self.redis_client = redis_client
+
+    def due_assets(
+        self,
+        assets: Sequence[TokenAsset],
+        now: Optional[float] = None,
+    ) -> list[TokenAsset]:
+        if not assets:
+            return []
+
+        now = time.time() if now is None else now
+        try:
+            scores = self.redis_client.zmscore(
+                REFRESH_DUE_KEY,
+                [asset.key for asset in assets],
+            )
+        except redis.RedisError as e:
+            logger.warning(
+                f"Refresh schedule unavailable, refreshing every asset: {e}"
+            )
+            return list(assets)
+        return [
+            asset
+            for asset, due_at in zip(assets, scores)
+            if due_at is None or due_at <= now
+        ]
+
+    def reschedule(
+        self,
+        results: Sequence[dict],
+        thresholds: Optional[dict[str, list[float]]] = None,
+        now: Optional[float] = None,
+    ) -> dict[str, float]:
+        updated = [r for r in results if r["status"] == "success"]
+        if not updated:
+            return {}
+
+        now = time.time() if now is None else now
+        thresholds = thresholds or {}
+        keys = [r["asset"].key for r in updated]
+        try:
+            last_prices = self.redis_client.hmget(REFRESH_LAST_PRICE_KEY, keys)
+        except redis.RedisError as e:
+            logger.warning(f"Refresh schedule update skipped: {e}")
+            return {}
+
+        due: dict[str, float] = {}
+        prices: dict[str, float] = {}
+        for key, result, last_price in zip(keys, updated, last_prices):
+            price = result["price_dex"]
+            change_pct = 0.0
+            if last_price is not None and float(last_price) > 0:
+                change_pct = (price - float(last_price)) / float(last_price)
+                change_pct *= 100
+
+            threshold_gap = None
+            symbol_thresholds = thresholds.get(
+                result["asset"].cex_symbol.upper()
+            )
+            if symbol_thresholds:
+                threshold_gap = min(
+                    abs(result["spread"] - threshold)
+                    for threshold in symbol_thresholds
+                )
+
+            interval = refresh_interval(
+                change_pct,
+                result["spread"],
+                threshold_gap,
+            )
+            due[key] = now + interval
+            prices[key] = price
+
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.zadd(REFRESH_DUE_KEY, due)
+            pipe.hset(REFRESH_LAST_PRICE_KEY, mapping=prices)
+            pipe.expire(REFRESH_DUE_KEY, REFRESH_STATE_TTL)
+            pipe.expire(REFRESH_LAST_PRICE_KEY, REFRESH_STATE_TTL)
+            pipe.execute()
+        except redis.RedisError as e:
+            # Unscheduled assets are simply due again next cycle.
+            logger.warning(f"Refresh schedule update failed: {e}")
+            return {}
+
+        return due
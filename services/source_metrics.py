@@ -0,0 +1,133 @@
+import bisect
+import threading
+from typing import Iterable, Optional
+
+DB_WRITE = "db_write"
+
+LATENCY_BUCKETS_MS = (
+    5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000,
+)
+
+
+class LatencyHistogram:
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, latency: float) -> None:
+        latency_ms = latency * 1000
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, latency_ms)] += 1
+        self.count += 1
+        self.sum_ms += latency_ms
+        self.max_ms = max(self.max_ms, latency_ms)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = pct / 100 * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = LATENCY_BUCKETS_MS[index - 1] if index else 0.0
+                upper = (
+                    LATENCY_BUCKETS_MS[index]
+                    if index < len(LATENCY_BUCKETS_MS)
+                    else self.max_ms
+                )
+                upper = min(upper, self.max_ms)
+                estimate = lower + (upper - lower) * (rank - seen) / count
+                return round(min(estimate, self.max_ms), 2)
+            seen += count
+        return round(self.max_ms, 2)
+
+    def merge(self, data: dict) -> None:
+        for index, count in enumerate(data.get("buckets", [])):
+            self.counts[index] += count
+        self.count += data.get("count", 0)
+        self.sum_ms += data.get("sum_ms", 0.0)
+        self.max_ms = max(self.max_ms, data.get("max_ms", 0.0))
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum_ms": round(self.sum_ms, 2),
+            "mean_ms": round(self.sum_ms / self.count, 2) if self.count else None,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "max_ms": round(self.max_ms, 2),
+            "buckets": list(self.counts),
+        }
+
+
+class _SourceStats:
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.errors = 0
+        self.timeouts = 0
+        self.retries = 0
+        self.bytes_received = 0
+
+    def merge(self, data: dict) -> None:
+        self.latency.merge(data.get("latency", {}))
+        self.errors += data.get("errors", 0)
+        self.timeouts += data.get("timeouts", 0)
+        self.retries += data.get("retries", 0)
+        self.bytes_received += data.get("bytes_received", 0)
+
+    def to_dict(self) -> dict:
+        return {
+            "requests": self.latency.count,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "retries": self.retries,
+            "bytes_received": self.bytes_received,
+            "latency": self.latency.to_dict(),
+        }
+
+
+class SourceMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sources: dict[str, _SourceStats] = {}
+
+    def observe(
+        self,
+        source: str,
+        latency: float,
+        bytes_received: int = 0,
+        retries: int = 0,
+        error: bool = False,
+        timeout: bool = False,
+    ) -> None:
+        with self._lock:
+            stats = self._sources.setdefault(source, _SourceStats())
+            stats.latency.observe(latency)
+            stats.bytes_received += bytes_received
+            stats.retries += retries
+            stats.errors += int(error or timeout)
+            stats.timeouts += int(timeout)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._sources.clear()
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                source: stats.to_dict()
+                for source, stats in sorted(self._sources.items())
+            }
+
+    @classmethod
+    def merge(cls, snapshots: Iterable[dict]) -> "SourceMetrics":
+        merged = cls()
+        for snapshot in snapshots:
+            for source, data in (snapshot or {}).items():
+                merged._sources.setdefault(source, _SourceStats()).merge(data)
+        return merged
+
+
+source_metrics = SourceMetrics()
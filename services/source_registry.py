@@ -0,0 +1,287 @@
+import asyncio
+import os
+from abc import ABC, abstractmethod
+import statistics
+import time
+from typing import NamedTuple, Optional, Sequence
+
+from app.core.logger import logger
+from app.services.price_sources import (
+    CEX_MEXC_TICKER_URL,
+    CEX_QUOTE_SUFFIX,
+    fetch_json,
+)
+from app.services.rate_limiter import CEX_HOST, RATE_LIMITS
+
+CEX_SOURCES = [
+    name.strip().lower()
+    for name in os.getenv("CEX_SOURCES", "mexc").split(",")
+    if name.strip()
+]
+AGGREGATION_METHOD = os.getenv("PRICE_AGGREGATION", "median").lower()
+SOURCE_LATENCY_BUDGET = float(os.getenv("SOURCE_LATENCY_BUDGET", "3"))
+SOURCE_OUTLIER_PCT = float(os.getenv("SOURCE_OUTLIER_PCT", "10"))
+
+MEDIAN = "median"
+WEIGHTED = "weighted"
+
+
+class SourceQuote(NamedTuple):
+    source: str
+    price: float
+    weight: float = 0.0
+
+
+class PriceSourceAdapter(ABC):
+    name: str = ""
+    kind: str = ""
+    host: str = ""
+    batch: bool = False
+    max_batch: Optional[int] = None
+    rate_limit: tuple[float, float] = (5.0, 10.0)
+    timeout: float = 5
+
+    @abstractmethod
+    async def fetch_many(
+        self,
+        session,
+        keys: Sequence[str],
+    ) -> dict[str, SourceQuote]:
+        ...
+
+    async def fetch_one(self, session, key: str) -> Optional[SourceQuote]:
+        return (await self.fetch_many(session, [key])).get(key)
+
+
+class _TickerListAdapter(PriceSourceAdapter):
+    kind = "cex"
+    batch = True
+    url: str = ""
+    symbol_suffix: str = "USDT"
+
+    def tickers(self, data) -> list[dict]:
+        return data or []
+
+    @abstractmethod
+    def quote(self, ticker: dict) -> Optional[SourceQuote]:
+        ...
+
+    async def fetch_many(
+        self,
+        session,
+        keys: Sequence[str],
+    ) -> dict[str, SourceQuote]:
+        status, data = await fetch_json(
+            session, self.url, self.timeout, self.name
+        )
+        if not (200 <= status < 300):
+            raise RuntimeError(f"{self.name} ticker error {status}")
+
+        wanted = {key.upper() for key in keys}
+        quotes = {}
+        for ticker in self.tickers(data):
+            symbol = (ticker.get("symbol") or "").upper()
+            if not symbol.endswith(self.symbol_suffix):
+                continue
+            base = symbol[:-len(self.symbol_suffix)]
+            if base not in wanted:
+                continue
+            quote = self.quote(ticker)
+            if quote is not None and quote.price > 0:
+                quotes[base] = quote
+        return quotes
+
+
+class MexcSource(_TickerListAdapter):
+    name = "mexc"
+    host = CEX_HOST
+    url = CEX_MEXC_TICKER_URL
+    symbol_suffix = CEX_QUOTE_SUFFIX
+    rate_limit = RATE_LIMITS[CEX_HOST]
+
+    def tickers(self, data) -> list[dict]:
+        return (data or {}).get("data") or []
+
+    def quote(self, ticker: dict) -> Optional[SourceQuote]:
+        price = ticker.get("indexPrice")
+        if price is None:
+            return None
+        return SourceQuote(
+            self.name,
+            float(price),
+            float(ticker.get("amount24") or 0),
+        )
+
+
+class BinanceSource(_TickerListAdapter):
+    name = "binance"
+    host = "api.binance.com"
+    url = "https://api.binance.com/api/v3/ticker/24hr?type=MINI"
+    rate_limit = (
+        float(os.getenv("BINANCE_RATE_LIMIT", "5")),
+        float(os.getenv("BINANCE_RATE_BURST", "10")),
+    )
+
+    def quote(self, ticker: dict) -> Optional[SourceQuote]:
+        price = ticker.get("lastPrice")
+        if price is None:
+            return None
+        return SourceQuote(
+            self.name,
+            float(price),
+            float(ticker.get("quoteVolume") or 0),
+        )
+
+
+class BybitSource(_TickerListAdapter):
+    name = "bybit"
+    host = "api.bybit.com"
+    url = "https://api.bybit.com/v5/market/tickers?category=linear"
+    rate_limit = (
+        float(os.getenv("BYBIT_RATE_LIMIT", "5")),
+        float(os.getenv("BYBIT_RATE_BURST", "10")),
+    )
+
+    def tickers(self, data) -> list[dict]:
+        return ((data or {}).get("result") or {}).get("list") or []
+
+    def quote(self, ticker: dict) -> Optional[SourceQuote]:
+        price = ticker.get("indexPrice") or ticker.get("lastPrice")
+        if not price:
+            return None
+        return SourceQuote(
+            self.name,
+            float(price),
+            float(ticker.get("turnover24h") or 0),
+        )
+
+
+_registry: dict[str, PriceSourceAdapter] = {}
+
+
+def register_source(adapter: PriceSourceAdapter) -> PriceSourceAdapter:
+    _registry[adapter.name] = adapter
+    RATE_LIMITS.setdefault(adapter.host, adapter.rate_limit)
+    return adapter
+
+
+def get_sources(
+    kind: str,
+    names: Optional[Sequence[str]] = None,
+) -> list[PriceSourceAdapter]:
+    return [
+        adapter for adapter in _registry.values()
+        if adapter.kind == kind and (names is None or adapter.name in names)
+    ]
+
+
+for _adapter in (MexcSource(), BinanceSource(), BybitSource()):
+    register_source(_adapter)
+
+
+def aggregate_quotes(
+    quotes: Sequence[SourceQuote],
+    method: str = AGGREGATION_METHOD,
+    outlier_pct: float = SOURCE_OUTLIER_PCT,
+) -> Optional[float]:
+    if not quotes:
+        return None
+
+    median = statistics.median(quote.price for quote in quotes)
+    if len(quotes) > 2 and outlier_pct > 0:
+        quotes = [
+            quote for quote in quotes
+            if abs(quote.price - median) / median * 100 <= outlier_pct
+        ]
+
+    if method == WEIGHTED:
+        total_weight = sum(quote.weight for quote in quotes)
+        if total_weight > 0:
+            return sum(
+                quote.price * quote.weight for quote in quotes
+            ) / total_weight
+
+    return statistics.median(quote.price for quote in quotes)
+
+
+async def _collect(
+    adapter: PriceSourceAdapter,
+    session,
+    keys: Sequence[str],
+) -> dict[str, SourceQuote]:
+    if adapter.batch:
+        size = adapter.max_batch or len(keys) or 1
+        batches = [keys[i:i + size] for i in range(0, len(keys), size)]
+        results = await asyncio.gather(
+            *(adapter.fetch_many(session, batch) for batch in batches)
+        )
+    else:
+        quotes = await asyncio.gather(
+            *(adapter.fetch_one(session, key) for key in keys)
+        )
+        results = [
+            {key: quote}
+            for key, quote in zip(keys, quotes)
+            if quote is not None
+        ]
+
+    merged: dict[str, SourceQuote] = {}
+    for result in results:
+        merged.update(result)
+    return merged
+
+
+async def get_aggregated_prices(
+    session,
+    kind: str,
+    keys: Sequence[str],
+    names: Optional[Sequence[str]] = None,
+    budget: float = SOURCE_LATENCY_BUDGET,
+    method: str = AGGREGATION_METHOD,
+) -> dict[str, float]:
+    adapters = get_sources(kind, names)
+    keys = list(dict.fromkeys(keys))
+    if not adapters or not keys:
+        return {}
+
+    started = time.monotonic()
+    tasks = {
+        asyncio.ensure_future(_collect(adapter, session, keys)): adapter
+        for adapter in adapters
+    }
+    done, pending = await asyncio.wait(tasks, timeout=budget)
+
+    for task in pending:
+        task.cancel()
+    if pending:
+        # Let the cancelled requests unwind (and release their connections)
+        # before the session they use goes away.
+        await asyncio.gather(*pending, return_exceptions=True)
+        logger.warning(
+            "Dropped late price sources after "
+            f"{budget}s: {sorted(tasks[task].name for task in pending)}"
+        )
+
+    quotes: dict[str, list[SourceQuote]] = {}
+    for task in done:
+        adapter = tasks[task]
+        try:
+            result = task.result()
+        except Exception as e:
+            logger.error(f"Price source {adapter.name} failed: {e!r}")
+            continue
+        for key, quote in result.items():
+            quotes.setdefault(key, []).append(quote)
+
+    prices = {}
+    for key, key_quotes in quotes.items():
+        price = aggregate_quotes(key_quotes, method)
+        if price is not None:
+            prices[key] = price
+
+    logger.debug(
+        f"Aggregated {len(prices)}/{len(keys)} {kind} prices from "
+        f"{len(done)} sources in "
+        f"{time.monotonic() - started:.2f}s"
+    )
+    return prices
@@ -1 +1,2 @@
 from app.tasks.prices_tasks import update_all_tokens_task
+from app.tasks.maintenance_tasks import maintain_price_partitions_task
@@ -0,0 +1,26 @@
+from celery import shared_task
+from celery.utils.log import get_task_logger
+
+from app.dependencies_sync import get_db
+from app.services.price_partitions import maintain_partitions
+
+task_logger = get_task_logger(__name__)
+
+
+@shared_task(
+    name="maintain_price_partitions_task",
+    queue="default",
+    autoretry_for=(Exception,),
+    retry_backoff=True,
+    max_retries=3,
+)
+def maintain_price_partitions_task():
+    try:
+        with get_db() as db:
+            result = maintain_partitions(db.connection())
+    except Exception as e:
+        task_logger.error(f"Partition maintenance failed: {e}", exc_info=True)
+        raise
+
+    task_logger.info(f"Partition maintenance completed: {result}")
+    return result
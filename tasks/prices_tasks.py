@@ -1,83 +1,112 @@
+import asyncio
+import hashlib
+import json
 import os
+import threading
 import time
-import uuid
 from datetime import datetime, timezone
-from typing import Sequence
+from typing import Optional, Sequence
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+import aiohttp
 import redis
 import requests
-from celery import shared_task
+from celery import chord, group, shared_task
+from celery.signals import worker_process_init, worker_process_shutdown
 from celery.utils.log import get_task_logger
 
 from app.core.logger import logger
 from app.dependencies_sync import get_db
-from app.models.token import Token
-from app.services.prices_sync import create_http_session
-from app.services.prices_sync import create_price_service_for_celery
+from app.crud.prices_sync import (
+    StaleFencingToken,
+    create_prices,
+    get_fencing_token,
+)
+from app.crud.subscriptions_sync import get_subscription_thresholds
+from app.crud.token_sync import get_token_records
+from app.schemas.token import TokenAsset, TokenRecord
+from app.services.price_sources_sync import (
+    get_cex_prices_snapshot,
+    get_dex_prices,
+)
+from app.services.http_clients import (
+    close_async_http_session,
+    close_http_session,
+    get_async_http_session,
+    get_http_session,
+)
+from app.services.prices_sync import (
+    PRICE_FETCH_DEADLINE,
+    fetch_asset_prices,
+)
+from app.services import price_sources
+from app.services.redis_clients import (
+    close_async_redis,
+    get_async_redis,
+    get_redis,
+)
+from app.services.cex_stream import (
+    CEX_STREAM_ENABLED,
+    read_price_board,
+    read_price_board_async,
+)
+from app.services.price_cache import cache_stats
+from app.services.source_registry import CEX_SOURCES, get_aggregated_prices
+from app.services.cycle_metrics import add_cycle_to_series
+from app.services.source_metrics import (
+    DB_WRITE,
+    SourceMetrics,
+    source_metrics,
+)
+from app.services.redis_lock import RedisLock
+from app.services.refresh_scheduler import RefreshScheduler
+from app.services.deadband import DEADBAND_ENABLED, PriceDeadband
+from app.services.cycle_checkpoint import CHECKPOINT_KEY, CycleCheckpoint
+from app.services.cycle_deadline import (
+    CARRYOVER_KEY,
+    CYCLE_DEADLINE,
+    CarryOver,
+    CycleDeadline,
+)
+from app.services.prices import (
+    fetch_asset_prices as fetch_asset_prices_async,
+)
 
 
 task_logger = get_task_logger(__name__)
 
 MAX_WORKERS = int(os.getenv("MAX_CONCURRENT_REQUESTS", "5"))
-RATE_LIMIT_DELAY = float(os.getenv("RATE_LIMIT_DELAY", "1.0"))
-LOCK_TIMEOUT = int(os.getenv("TASK_LOCK_TIMEOUT", "300"))
+LOCK_TIMEOUT = int(os.getenv("TASK_LOCK_TIMEOUT", "30"))
 LOCK_KEY = "celery:lock:update_all_tokens"
 HTTP_TIMEOUT = int(os.getenv("HTTP_TIMEOUT", "30"))
+DEX_BATCH_SIZE = int(os.getenv("DEX_BATCH_SIZE", "30"))
+CEX_BULK_SNAPSHOT = os.getenv("CEX_BULK_SNAPSHOT", "true").lower() == "true"
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
-
-
-class RedisLock:
-    def __init__(
-        self,
-        redis_client: redis.Redis,
-        lock_key: str,
-        timeout: int,
-    ):
-        self.redis_client = redis_client
-        self.lock_key = lock_key
-        self.timeout = timeout
-        self.task_id = str(uuid.uuid4())
-        self.lock_acquired = False
-
-    def __enter__(self):
-        self.lock_acquired = self.redis_client.set(
-            self.lock_key,
-            self.task_id,
-            nx=True,
-            ex=self.timeout,
-        )
-
-        if not self.lock_acquired:
-            current_lock = self.redis_client.get(self.lock_key)
-            lock_ttl = self.redis_client.ttl(self.lock_key)
-            task_logger.warning(
-                f"Lock already held by {current_lock}, TTL: {lock_ttl}s"
-            )
-        else:
-            task_logger.info(f"Lock acquired: {self.task_id}")
-
-        return self.lock_acquired
-
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        if self.lock_acquired:
-            try:
-                current_lock = self.redis_client.get(self.lock_key)
-                if current_lock and current_lock == self.task_id:
-                    self.redis_client.delete(self.lock_key)
-                    task_logger.info(f"Lock released: {self.task_id}")
-            except Exception as e:
-                task_logger.error(f"Error releasing lock: {e}")
+INGESTION_ENGINE = os.getenv("INGESTION_ENGINE", "async").lower()
+ASYNC_MAX_CONCURRENCY = int(os.getenv("ASYNC_MAX_CONCURRENCY", "200"))
+DB_WRITE_CHUNK_SIZE = int(os.getenv("DB_WRITE_CHUNK_SIZE", "1000"))
+SHARD_COUNT = max(1, int(os.getenv("PRICE_SHARD_COUNT", "1")))
+ADAPTIVE_REFRESH = os.getenv("ADAPTIVE_REFRESH", "false").lower() == "true"
+CHECKPOINT_CHUNK_SIZE = int(os.getenv("PRICE_CHECKPOINT_CHUNK_SIZE", "1000"))
 
 
 class TaskStats:
     def __init__(self):
+        self._lock = threading.Lock()
         self.total = 0
         self.success = 0
         self.warning = 0
         self.error = 0
+        self.skipped = 0
+        self.deferred = 0
+        self.sources: dict[str, dict] = {}
         self.start_time = datetime.now(timezone.utc)
 
+    def incr(self, **counts: int) -> None:
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
     @property
     def duration(self) -> float:
         return (datetime.now(timezone.utc) - self.start_time).total_seconds()
@@ -94,35 +123,50 @@ class TaskStats:
             "success": self.success,
             "warning": self.warning,
             "error": self.error,
+            "skipped": self.skipped,
+            "deferred": self.deferred,
             "success_rate": self.success_rate,
             "duration_seconds": round(self.duration, 2),
+            "started_at": self.start_time.isoformat(),
             "timestamp": datetime.now(timezone.utc).isoformat(),
+            "sources": self.sources,
         }
 
+    @classmethod
+    def merge(cls, results: Sequence[dict]) -> "TaskStats":
+        merged = cls()
+        completed = [
+            result for result in results
+            if result.get("status") == "completed"
+        ]
+        for result in completed:
+            merged.total += result.get("total", 0)
+            merged.success += result.get("success", 0)
+            merged.warning += result.get("warning", 0)
+            merged.error += result.get("error", 0)
+            merged.skipped += result.get("skipped", 0)
+            merged.deferred += result.get("deferred", 0)
+            if "started_at" in result:
+                merged.start_time = min(
+                    merged.start_time,
+                    datetime.fromisoformat(result["started_at"]),
+                )
+        merged.sources = SourceMetrics.merge(
+            result.get("sources") for result in completed
+        ).to_dict()
+        return merged
+
     def save_to_redis(self, redis_client: redis.Redis):
         try:
-            redis_client.hincrby(
-                "metrics:price_updates",
-                "total",
-                self.total,
-            )
-            redis_client.hincrby(
-                "metrics:price_updates",
-                "success",
-                self.success,
-            )
-            redis_client.hincrby(
-                "metrics:price_updates",
-                "warning",
-                self.warning,
-            )
-            redis_client.hincrby(
-                "metrics:price_updates",
-                "error",
-                self.error,
-            )
+            pipe = redis_client.pipeline(transaction=True)
+            for field in ("total", "success", "warning", "error"):
+                pipe.hincrby(
+                    "metrics:price_updates",
+                    field,
+                    getattr(self, field),
+                )
 
-            redis_client.hset(
+            pipe.hset(
                 "metrics:last_update",
                 mapping={
                     "timestamp": datetime.now(timezone.utc).isoformat(),
@@ -133,93 +177,171 @@ class TaskStats:
                 },
             )
 
-            redis_client.expire("metrics:price_updates", 2592000)
-            redis_client.expire("metrics:last_update", 2592000)
+            for source, data in self.sources.items():
+                for field in (
+                    "requests", "errors", "timeouts", "retries",
+                    "bytes_received",
+                ):
+                    pipe.hincrby(
+                        "metrics:sources",
+                        f"{source}:{field}",
+                        data[field],
+                    )
+            if self.sources:
+                pipe.hset(
+                    "metrics:sources:last",
+                    mapping={
+                        source: json.dumps(data["latency"])
+                        for source, data in self.sources.items()
+                    },
+                )
+
+            add_cycle_to_series(pipe, self.to_dict())
+
+            pipe.expire("metrics:price_updates", 2592000)
+            pipe.expire("metrics:last_update", 2592000)
+            pipe.expire("metrics:sources", 2592000)
+            pipe.expire("metrics:sources:last", 2592000)
+            pipe.execute()
 
             task_logger.debug("Metrics saved to Redis")
         except Exception as e:
             task_logger.error(f"Error saving metrics to Redis: {e}")
 
 
-def fetch_token_price(
+def _asset_deadline(cycle: Optional[CycleDeadline]) -> float:
+    if cycle is None:
+        return PRICE_FETCH_DEADLINE
+    return cycle.request_timeout(PRICE_FETCH_DEADLINE)
+
+
+def _prices_in_hand(
+    asset: TokenAsset,
+    dex_prices: Optional[dict[str, Optional[float]]],
+    cex_prices: Optional[dict[str, float]],
+) -> bool:
+    # Both prices were prefetched this cycle, so storing the asset needs
+    # no further requests even once the dispatch window has closed.
+    return (
+        dex_prices is not None
+        and dex_prices.get(asset.address) is not None
+        and cex_prices is not None
+        and cex_prices.get((asset.cex_symbol or "").upper()) is not None
+    )
+
+
+def fetch_asset_price(
     http_session: requests.Session,
-    token_id: int,
+    asset: TokenAsset,
     stats: TaskStats,
+    dex_prices: Optional[dict[str, Optional[float]]] = None,
+    cex_prices: Optional[dict[str, float]] = None,
+    cycle: Optional[CycleDeadline] = None,
 ) -> dict:
-    try:
-        task_logger.debug(f"Fetching price for token {token_id}")
+    token_ids = list(asset.token_ids)
+    if (
+        cycle is not None
+        and cycle.expired()
+        and not _prices_in_hand(asset, dex_prices, cex_prices)
+    ):
+        stats.incr(deferred=len(token_ids))
+        return {"status": "deferred", "asset": asset, "token_ids": token_ids}
 
-        price = create_price_service_for_celery(http_session, token_id)
+    try:
+        task_logger.debug(
+            f"Fetching price for {asset.chain}:{asset.address} "
+            f"({len(token_ids)} tokens)"
+        )
 
-        time.sleep(RATE_LIMIT_DELAY)
+        price_dex, price_cex, spread = fetch_asset_prices(
+            http_session,
+            asset.address,
+            asset.cex_symbol,
+            dex_prices=dex_prices,
+            cex_prices=cex_prices,
+            deadline=_asset_deadline(cycle),
+        )
 
-        if price and hasattr(price, "id") and price.id:
-            stats.success += 1
-            task_logger.info(f"Token {token_id}: Price {price.id} created")
-            return {
-                "status": "success",
-                "token_id": token_id,
-                "price_id": price.id,
-            }
-        else:
-            stats.warning += 1
-            task_logger.warning(f"Token {token_id}: Price not created")
-            return {
-                "status": "warning",
-                "token_id": token_id,
-                "message": "Price object is None or has no ID",
-            }
+        return {
+            "status": "success",
+            "asset": asset,
+            "token_ids": token_ids,
+            "price_dex": price_dex,
+            "price_cex": price_cex,
+            "spread": spread,
+        }
 
     except requests.Timeout:
-        stats.error += 1
-        task_logger.error(f"Token {token_id}: Timeout")
+        stats.incr(error=len(token_ids))
+        task_logger.error(f"Asset {asset.address}: Timeout")
         return {
             "status": "error",
-            "token_id": token_id,
+            "asset": asset,
+            "token_ids": token_ids,
             "error": "Timeout",
         }
     except Exception as e:
-        stats.error += 1
-        task_logger.error(f"Token {token_id}: {e}", exc_info=True)
+        stats.incr(error=len(token_ids))
+        task_logger.error(f"Asset {asset.address}: {e}", exc_info=True)
         return {
             "status": "error",
-            "token_id": token_id,
+            "asset": asset,
+            "token_ids": token_ids,
             "error": str(e),
         }
 
 
 def fetch_all_tokens(
-    token_ids: Sequence[int],
+    assets: Sequence[TokenAsset],
     stats: TaskStats,
+    http_session: Optional[requests.Session] = None,
+    cex_prices: Optional[dict[str, float]] = None,
+    cycle: Optional[CycleDeadline] = None,
 ) -> list[dict]:
-    http_session = create_http_session()
+    if http_session is None:
+        http_session = get_http_session()
     results = []
 
+    dex_prices = get_dex_prices(
+        http_session,
+        [asset.address for asset in assets],
+        batch_size=DEX_BATCH_SIZE,
+        deadline=cycle.prefetch_until() if cycle is not None else None,
+    )
+    task_logger.info(
+        f"Fetched DEX prices for {len(dex_prices)} addresses "
+        f"in batches of {DEX_BATCH_SIZE}"
+    )
+
     with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        future_to_token = {
+        future_to_asset = {
             executor.submit(
-                fetch_token_price,
+                fetch_asset_price,
                 http_session,
-                token_id,
+                asset,
                 stats,
-            ): token_id
-            for token_id in token_ids
+                dex_prices,
+                cex_prices,
+                cycle,
+            ): asset
+            for asset in assets
         }
 
-        for future in as_completed(future_to_token):
-            token_id = future_to_token[future]
+        for future in as_completed(future_to_asset):
+            asset = future_to_asset[future]
             try:
                 result = future.result()
                 results.append(result)
             except Exception as e:
-                stats.error += 1
+                stats.incr(error=len(asset.token_ids))
                 task_logger.error(
-                    f"Token {token_id}: Unhandled exception: {e}"
+                    f"Asset {asset.address}: Unhandled exception: {e}"
                 )
                 results.append(
                     {
                         "status": "error",
-                        "token_id": token_id,
+                        "asset": asset,
+                        "token_ids": list(asset.token_ids),
                         "error": str(e),
                     }
                 )
@@ -227,58 +349,607 @@ def fetch_all_tokens(
     return results
 
 
-def get_all_token_ids() -> list[int]:
+def run_sync_engine(
+    assets: Sequence[TokenAsset],
+    stats: TaskStats,
+    cycle: Optional[CycleDeadline] = None,
+    cex_prices: Optional[dict[str, float]] = None,
+) -> list[dict]:
+    return fetch_all_tokens(
+        assets,
+        stats,
+        http_session=get_http_session(),
+        cex_prices=cex_prices,
+        cycle=cycle,
+    )
+
+
+async def fetch_asset_price_async(
+    session: aiohttp.ClientSession,
+    semaphore: asyncio.Semaphore,
+    asset: TokenAsset,
+    stats: TaskStats,
+    dex_prices: Optional[dict[str, Optional[float]]] = None,
+    cex_prices: Optional[dict[str, float]] = None,
+    cycle: Optional[CycleDeadline] = None,
+) -> dict:
+    token_ids = list(asset.token_ids)
+    try:
+        async with semaphore:
+            if (
+                cycle is not None
+                and cycle.expired()
+                and not _prices_in_hand(asset, dex_prices, cex_prices)
+            ):
+                stats.incr(deferred=len(token_ids))
+                return {
+                    "status": "deferred",
+                    "asset": asset,
+                    "token_ids": token_ids,
+                }
+
+            price_dex, price_cex, spread = await fetch_asset_prices_async(
+                session,
+                asset.address,
+                asset.cex_symbol,
+                dex_prices=dex_prices,
+                cex_prices=cex_prices,
+                deadline=_asset_deadline(cycle),
+            )
+
+        return {
+            "status": "success",
+            "asset": asset,
+            "token_ids": token_ids,
+            "price_dex": price_dex,
+            "price_cex": price_cex,
+            "spread": spread,
+        }
+
+    except asyncio.TimeoutError:
+        stats.incr(error=len(token_ids))
+        task_logger.error(f"Asset {asset.address}: Timeout")
+        return {
+            "status": "error",
+            "asset": asset,
+            "token_ids": token_ids,
+            "error": "Timeout",
+        }
+    except Exception as e:
+        stats.incr(error=len(token_ids))
+        task_logger.error(f"Asset {asset.address}: {e!r}")
+        return {
+            "status": "error",
+            "asset": asset,
+            "token_ids": token_ids,
+            "error": str(e),
+        }
+
+
+async def load_cex_snapshot_async(
+    session: aiohttp.ClientSession,
+    symbols: Sequence[str] = (),
+) -> Optional[dict[str, float]]:
+    if CEX_STREAM_ENABLED:
+        try:
+            board = await read_price_board_async(get_async_redis())
+        except redis.RedisError as e:
+            task_logger.warning(f"CEX price board unavailable: {e}")
+            board = {}
+        if board:
+            task_logger.info(f"Using CEX price board ({len(board)} symbols)")
+            return board
+        task_logger.warning("CEX price board is empty or stale")
+
+    if len(CEX_SOURCES) > 1 and symbols:
+        try:
+            cex_prices = await get_aggregated_prices(
+                session,
+                "cex",
+                [symbol.upper() for symbol in symbols if symbol],
+                names=CEX_SOURCES,
+            )
+        except Exception as e:
+            task_logger.error(f"CEX aggregation failed: {e!r}")
+            cex_prices = {}
+        if cex_prices:
+            task_logger.info(
+                f"Aggregated CEX prices for {len(cex_prices)} symbols "
+                f"from {', '.join(CEX_SOURCES)}"
+            )
+            return cex_prices
+        task_logger.warning("CEX aggregation returned no prices")
+
+    if not CEX_BULK_SNAPSHOT:
+        return None
+
+    try:
+        cex_prices = await price_sources.get_cex_prices_snapshot(session)
+    except Exception as e:
+        task_logger.error(f"CEX snapshot failed: {e!r}")
+        cex_prices = {}
+
+    if not cex_prices:
+        task_logger.warning(
+            "CEX snapshot is empty, falling back to per-symbol requests"
+        )
+        return None
+
+    task_logger.info(f"Loaded CEX snapshot with {len(cex_prices)} symbols")
+    return cex_prices
+
+
+async def fetch_all_tokens_async(
+    assets: Sequence[TokenAsset],
+    stats: TaskStats,
+    cycle: Optional[CycleDeadline] = None,
+    cex_prices: Optional[dict[str, float]] = None,
+) -> list[dict]:
+    semaphore = asyncio.Semaphore(ASYNC_MAX_CONCURRENCY)
+    session = get_async_http_session()
+
+    dex_prices = await price_sources.get_dex_prices(
+        session,
+        [asset.address for asset in assets],
+        batch_size=DEX_BATCH_SIZE,
+        deadline=cycle.prefetch_until() if cycle is not None else None,
+    )
+    task_logger.info(
+        f"Fetched DEX prices for {len(dex_prices)} addresses "
+        f"in batches of {DEX_BATCH_SIZE}"
+    )
+
+    return await asyncio.gather(
+        *(
+            fetch_asset_price_async(
+                session,
+                semaphore,
+                asset,
+                stats,
+                dex_prices,
+                cex_prices,
+                cycle,
+            )
+            for asset in assets
+        )
+    )
+
+
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_worker_loop() -> asyncio.AbstractEventLoop:
+    global _worker_loop
+    if _worker_loop is None or _worker_loop.is_closed():
+        _worker_loop = asyncio.new_event_loop()
+    return _worker_loop
+
+
+async def _open_async_clients() -> None:
+    get_async_http_session()
+
+
+async def _close_async_clients() -> None:
+    await close_async_http_session()
+    await close_async_redis()
+
+
+@worker_process_init.connect
+def init_worker_clients(**kwargs):
+    get_http_session()
+    if INGESTION_ENGINE == "async":
+        get_worker_loop().run_until_complete(_open_async_clients())
+    task_logger.info("HTTP client pools initialised")
+
+
+@worker_process_shutdown.connect
+def close_worker_clients(**kwargs):
+    global _worker_loop
+    if _worker_loop is not None and not _worker_loop.is_closed():
+        _worker_loop.run_until_complete(_close_async_clients())
+        _worker_loop.close()
+    _worker_loop = None
+    close_http_session()
+
+
+def run_async_engine(
+    assets: Sequence[TokenAsset],
+    stats: TaskStats,
+    cycle: Optional[CycleDeadline] = None,
+    cex_prices: Optional[dict[str, float]] = None,
+) -> list[dict]:
+    return get_worker_loop().run_until_complete(
+        fetch_all_tokens_async(assets, stats, cycle, cex_prices)
+    )
+
+
+async def _load_cex_snapshot_async(
+    assets: Sequence[TokenAsset],
+) -> Optional[dict[str, float]]:
+    return await load_cex_snapshot_async(
+        get_async_http_session(),
+        [asset.cex_symbol for asset in assets if asset.cex_symbol],
+    )
+
+
+def load_cycle_cex_snapshot(
+    assets: Sequence[TokenAsset],
+) -> Optional[dict[str, float]]:
+    if INGESTION_ENGINE == "async":
+        return get_worker_loop().run_until_complete(
+            _load_cex_snapshot_async(assets)
+        )
+    return load_cex_snapshot(get_http_session())
+
+
+def defer_assets(
+    assets: Sequence[TokenAsset],
+    stats: TaskStats,
+) -> list[dict]:
+    results = []
+    for asset in assets:
+        token_ids = list(asset.token_ids)
+        stats.incr(deferred=len(token_ids))
+        results.append({
+            "status": "deferred",
+            "asset": asset,
+            "token_ids": token_ids,
+        })
+    return results
+
+
+def load_fencing_token(lock_key: str) -> int:
+    with get_db() as db:
+        return get_fencing_token(db, lock_key)
+
+
+def _insert_prices(
+    rows: Sequence[dict],
+    lock: Optional[RedisLock],
+) -> list[int]:
+    fence = (lock.lock_key, lock.fencing_token) if lock is not None else None
+    with get_db() as db:
+        return create_prices(
+            db,
+            rows,
+            chunk_size=DB_WRITE_CHUNK_SIZE,
+            fence=fence,
+        )
+
+
+def _recover_fence(
+    lock: Optional[RedisLock],
+    error: StaleFencingToken,
+) -> bool:
+    # A token below the database's while we still own the lock means the
+    # Redis counter went backwards (flush, restart, eviction), not that a
+    # newer holder exists. advance_fence re-checks ownership atomically.
+    if lock is None or lock.lost.is_set():
+        return False
+    token = lock.advance_fence(error.current)
+    if token is None:
+        return False
+    task_logger.warning(
+        f"Fencing counter for {lock.lock_key} was behind the database "
+        f"({error.token} < {error.current}), advanced to {token}"
+    )
+    return True
+
+
+def store_prices(
+    results: Sequence[dict],
+    stats: TaskStats,
+    deadband: Optional[PriceDeadband] = None,
+    lock: Optional[RedisLock] = None,
+) -> int:
+    rows = [
+        {
+            "token_id": token_id,
+            "price_dex": result["price_dex"],
+            "price_cex": result["price_cex"],
+            "spread": result["spread"],
+        }
+        for result in results
+        if result["status"] == "success"
+        for token_id in result["token_ids"]
+    ]
+
+    if not rows:
+        return 0
+
+    fetched = len(rows)
+    if deadband is not None:
+        rows = deadband.filter(rows)
+        stats.incr(skipped=fetched - len(rows))
+        if not rows:
+            task_logger.info(f"All {fetched} prices within deadband")
+            return fetched
+
+    started = time.monotonic()
+    try:
+        try:
+            price_ids = _insert_prices(rows, lock)
+        except StaleFencingToken as e:
+            if not _recover_fence(lock, e):
+                raise
+            price_ids = _insert_prices(rows, lock)
+    except StaleFencingToken as e:
+        source_metrics.observe(DB_WRITE, time.monotonic() - started, error=True)
+        stats.incr(error=len(rows))
+        task_logger.error(f"Bulk price insert rejected: {e}")
+        return 0
+    except Exception as e:
+        source_metrics.observe(DB_WRITE, time.monotonic() - started, error=True)
+        stats.incr(error=len(rows))
+        task_logger.error(f"Bulk price insert failed: {e}", exc_info=True)
+        return 0
+    source_metrics.observe(DB_WRITE, time.monotonic() - started)
+
+    if deadband is not None:
+        deadband.record(rows)
+
+    stats.incr(success=len(price_ids))
+    task_logger.info(
+        f"Stored {len(price_ids)} prices "
+        f"({fetched - len(rows)} unchanged skipped)"
+    )
+    return fetched
+
+
+def group_token_assets(records: Sequence[TokenRecord]) -> list[TokenAsset]:
+    grouped: dict[tuple[str, str, str], list[int]] = {}
+    for record in records:
+        key = (record.chain, record.address, record.cex_symbol)
+        grouped.setdefault(key, []).append(record.id)
+
+    return [
+        TokenAsset(chain, address, cex_symbol, tuple(token_ids))
+        for (chain, address, cex_symbol), token_ids in grouped.items()
+    ]
+
+
+def load_token_assets() -> list[TokenAsset]:
     try:
         with get_db() as db:
-            tokens = db.query(Token.id).all()
-            token_ids = [t.id for t in tokens]
+            records = get_token_records(db)
 
-            if not token_ids:
-                task_logger.warning("No tokens found in database")
-                return []
+        if not records:
+            task_logger.warning("No tokens found in database")
+            return []
 
-            task_logger.info(f"Found {len(token_ids)} tokens to update")
-            return token_ids
+        assets = group_token_assets(records)
+        task_logger.info(
+            f"Found {len(records)} tokens ({len(assets)} unique assets) "
+            "to update"
+        )
+        return assets
 
     except Exception as e:
-        task_logger.error(f"Error fetching token IDs: {e}", exc_info=True)
+        task_logger.error(f"Error loading tokens: {e}", exc_info=True)
         raise
 
 
-def _update_all_tokens() -> dict:
-    task_logger.info("Starting token price update")
+def load_subscription_thresholds() -> dict[str, list[float]]:
+    try:
+        with get_db() as db:
+            return get_subscription_thresholds(db)
+    except Exception as e:
+        task_logger.error(f"Error loading subscription thresholds: {e}")
+        return {}
+
+
+def shard_for_asset(asset: TokenAsset, shard_count: int) -> int:
+    digest = hashlib.md5(asset.key.encode()).digest()
+    key_hash = int.from_bytes(digest[:8], "big")
+
+    bucket, jump = -1, 0
+    while jump < shard_count:
+        bucket = jump
+        key_hash = (key_hash * 2862933555777941757 + 1) % (1 << 64)
+        jump = int((bucket + 1) * ((1 << 31) / ((key_hash >> 33) + 1)))
+    return bucket
+
+
+def shard_lock_key(shard_index: int, shard_count: int) -> str:
+    if shard_count == 1:
+        return LOCK_KEY
+    return f"{LOCK_KEY}:shard:{shard_index}"
+
+
+def shard_carryover_key(shard_index: int, shard_count: int) -> str:
+    if shard_count == 1:
+        return CARRYOVER_KEY
+    return f"{CARRYOVER_KEY}:shard:{shard_index}"
+
+
+def shard_checkpoint_key(shard_index: int, shard_count: int) -> str:
+    if shard_count == 1:
+        return CHECKPOINT_KEY
+    return f"{CHECKPOINT_KEY}:shard:{shard_index}"
+
+
+def load_cex_snapshot(
+    http_session: requests.Session,
+) -> Optional[dict[str, float]]:
+    if CEX_STREAM_ENABLED:
+        try:
+            board = read_price_board(get_redis())
+        except redis.RedisError as e:
+            task_logger.warning(f"CEX price board unavailable: {e}")
+            board = {}
+        if board:
+            task_logger.info(f"Using CEX price board ({len(board)} symbols)")
+            return board
+        task_logger.warning("CEX price board is empty or stale")
+
+    if not CEX_BULK_SNAPSHOT:
+        return None
+
+    cex_prices = get_cex_prices_snapshot(http_session)
+    if not cex_prices:
+        task_logger.warning(
+            "CEX snapshot is empty, falling back to per-symbol requests"
+        )
+        return None
+
+    task_logger.info(f"Loaded CEX snapshot with {len(cex_prices)} symbols")
+    return cex_prices
+
+
+def _update_all_tokens(
+    shard_index: int = 0,
+    shard_count: int = 1,
+    cycle_deadline: Optional[float] = CYCLE_DEADLINE,
+) -> dict:
+    task_logger.info(
+        f"Starting token price update (shard {shard_index + 1}/{shard_count})"
+    )
+    cycle = CycleDeadline(cycle_deadline)
 
     redis_client = redis.from_url(REDIS_URL, decode_responses=True)
+    lock_key = shard_lock_key(shard_index, shard_count)
 
-    with RedisLock(redis_client, LOCK_KEY, LOCK_TIMEOUT) as lock_acquired:
-        if not lock_acquired:
+    with RedisLock(
+        redis_client,
+        lock_key,
+        LOCK_TIMEOUT,
+        fence_floor=lambda: load_fencing_token(lock_key),
+    ) as lock:
+        if not lock.lock_acquired:
             return {
                 "status": "skipped",
+                "shard": shard_index,
                 "reason": "Task already running (lock held)",
             }
 
         try:
-            token_ids = get_all_token_ids()
+            assets = load_token_assets()
+            if shard_count > 1:
+                assets = [
+                    asset for asset in assets
+                    if shard_for_asset(asset, shard_count) == shard_index
+                ]
 
-            if not token_ids:
+            scheduler = None
+            if ADAPTIVE_REFRESH and assets:
+                scheduler = RefreshScheduler(redis_client)
+                tracked = len(assets)
+                assets = scheduler.due_assets(assets)
+                task_logger.info(
+                    f"{len(assets)} of {tracked} assets are due for refresh"
+                )
+
+            carryover = CarryOver(
+                redis_client,
+                shard_carryover_key(shard_index, shard_count),
+            )
+            assets = carryover.prioritize(assets)
+
+            checkpoint = CycleCheckpoint(
+                redis_client,
+                shard_checkpoint_key(shard_index, shard_count),
+            )
+            cycle_id = checkpoint.begin()
+            if checkpoint.resumed:
+                assets = checkpoint.pending(assets)
+                task_logger.info(
+                    f"Resuming cycle {cycle_id}: "
+                    f"{len(checkpoint.completed)} tokens already stored"
+                )
+
+            if not assets:
+                checkpoint.finish()
                 return {
                     "status": "completed",
+                    "shard": shard_index,
                     "total": 0,
                     "success": 0,
                     "message": "No tokens to update",
                 }
 
             stats = TaskStats()
-            stats.total = len(token_ids)
+            stats.total = sum(len(asset.token_ids) for asset in assets)
 
-            task_logger.info(f"Processing {stats.total} tokens...")
-            results = fetch_all_tokens(token_ids, stats)
+            task_logger.info(
+                f"Processing {stats.total} tokens "
+                f"({len(assets)} unique assets, "
+                f"engine={INGESTION_ENGINE})..."
+            )
+            deadband = PriceDeadband(redis_client) if DEADBAND_ENABLED else None
+            source_metrics.reset()
+            cache_stats.reset()
+            cex_prices = load_cycle_cex_snapshot(assets)
+            results = []
+            stored = 0
+            for start in range(0, len(assets), CHECKPOINT_CHUNK_SIZE):
+                if cycle.expired():
+                    results.extend(defer_assets(assets[start:], stats))
+                    break
+
+                chunk = assets[start:start + CHECKPOINT_CHUNK_SIZE]
+                if INGESTION_ENGINE == "async":
+                    chunk_results = run_async_engine(
+                        chunk, stats, cycle, cex_prices
+                    )
+                else:
+                    chunk_results = run_sync_engine(
+                        chunk, stats, cycle, cex_prices
+                    )
+
+                if lock.lost.is_set():
+                    task_logger.warning(
+                        "Lock lease was lost during the cycle, "
+                        "the price write will be fenced off"
+                    )
+                chunk_stored = store_prices(
+                    chunk_results,
+                    stats,
+                    deadband=deadband,
+                    lock=lock,
+                )
+                if chunk_stored:
+                    checkpoint.mark(
+                        token_id
+                        for result in chunk_results
+                        if result["status"] == "success"
+                        for token_id in result["token_ids"]
+                    )
+                stored += chunk_stored
+                results.extend(chunk_results)
             logger.debug(f"Processed {len(results)} results")
 
-            if stats.success > 0:
+            deferred = [
+                result["asset"] for result in results
+                if result["status"] == "deferred"
+            ]
+            carryover.save(deferred)
+            if deferred:
+                task_logger.warning(
+                    f"Cycle deadline reached, {len(deferred)} assets "
+                    "carried over to the next cycle"
+                )
+
+            stats.sources = source_metrics.to_dict()
+
+            if scheduler is not None and stored:
+                scheduler.reschedule(
+                    results,
+                    thresholds=load_subscription_thresholds(),
+                )
+
+            checkpoint.finish()
+
+            if shard_count == 1:
                 stats.save_to_redis(redis_client)
 
             result = stats.to_dict()
+            result["shard"] = shard_index
+            result["assets"] = len(assets)
+            result["engine"] = INGESTION_ENGINE
+            result["cycle_deadline"] = cycle.seconds
+            result["cycle_id"] = cycle_id
+            result["resumed"] = checkpoint.resumed
+            result["price_cache"] = cache_stats.to_dict()
             result["status"] = "completed"
 
             task_logger.info(f"Update completed: {result}")
@@ -312,7 +983,10 @@ def update_all_tokens_task(self):
     )
 
     try:
-        result = _update_all_tokens()
+        if SHARD_COUNT > 1:
+            result = dispatch_shards(SHARD_COUNT)
+        else:
+            result = _update_all_tokens()
 
         task_logger.info(f"Task completed Result: {result}")
         return result
@@ -332,3 +1006,76 @@ def update_all_tokens_task(self):
                 f"Task failed permanently after {self.max_retries} retries"
             )
             raise
+
+
+def dispatch_shards(shard_count: int) -> dict:
+    job = chord(
+        group(
+            update_token_shard_task.s(shard_index, shard_count)
+            for shard_index in range(shard_count)
+        ),
+        aggregate_shard_stats_task.s(),
+    )
+    async_result = job.apply_async()
+
+    task_logger.info(
+        f"Dispatched {shard_count} shards [chord: {async_result.id}]"
+    )
+    return {
+        "status": "dispatched",
+        "shards": shard_count,
+        "chord_id": async_result.id,
+    }
+
+
+@shared_task(
+    name="update_token_shard_task",
+    bind=True,
+    queue="prices",
+    autoretry_for=(),
+    time_limit=600,
+    soft_time_limit=540,
+    acks_late=True,
+)
+def update_token_shard_task(self, shard_index: int, shard_count: int):
+    task_logger.info(
+        f"Shard {shard_index + 1}/{shard_count} started "
+        f"[ID: {self.request.id}]"
+    )
+
+    try:
+        return _update_all_tokens(shard_index, shard_count)
+    except Exception as e:
+        task_logger.error(
+            f"Shard {shard_index + 1}/{shard_count} failed: {e}",
+            exc_info=True,
+        )
+        return {
+            "status": "failed",
+            "shard": shard_index,
+            "error": str(e),
+        }
+
+
+@shared_task(
+    name="aggregate_shard_stats_task",
+    queue="prices",
+    autoretry_for=(),
+)
+def aggregate_shard_stats_task(results: list[dict]):
+    stats = TaskStats.merge(results)
+
+    redis_client = redis.from_url(REDIS_URL, decode_responses=True)
+    try:
+        stats.save_to_redis(redis_client)
+    finally:
+        redis_client.close()
+
+    result = stats.to_dict()
+    result["status"] = "completed"
+    result["shards"] = {
+        str(shard.get("shard")): shard.get("status") for shard in results
+    }
+
+    task_logger.info(f"Shards aggregated: {result}")
+    return result